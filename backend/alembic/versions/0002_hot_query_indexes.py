@@ -0,0 +1,59 @@
+"""hot query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the filters used by the cart, order and catalog routers."""
+    # Fold any duplicate (user, product) cart lines into the oldest one so the
+    # unique index can be built.
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(d.quantity) FROM cart_items d
+            WHERE d.user_id = cart_items.user_id AND d.product_id = cart_items.product_id
+        )
+        WHERE id IN (SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id HAVING COUNT(*) > 1)
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items
+        WHERE id NOT IN (SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id)
+        """
+    )
+
+    op.create_index(
+        "uq_cart_items_user_product", "cart_items", ["user_id", "product_id"], unique=True, if_not_exists=True
+    )
+    op.create_index("ix_orders_user_created", "orders", ["user_id", "created_at"], if_not_exists=True)
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"], if_not_exists=True)
+    op.create_index(
+        "ix_products_active_category_price",
+        "products",
+        ["is_active", "category_id", "price", "stock"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the hot query indexes."""
+    op.drop_index("ix_products_active_category_price", table_name="products")
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
+    op.drop_index("ix_orders_user_created", table_name="orders")
+    op.drop_index("uq_cart_items_user_product", table_name="cart_items")
@@ -0,0 +1,47 @@
+"""stock reservations
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add cart stock holds and the per-product reserved counter."""
+    op.add_column("products", sa.Column("reserved", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_stock_reservations_user_product", "stock_reservations", ["user_id", "product_id"], unique=True
+    )
+    op.create_index("ix_stock_reservations_expires_at", "stock_reservations", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Drop the holds and the reserved counter."""
+    op.drop_index("ix_stock_reservations_expires_at", table_name="stock_reservations")
+    op.drop_index("uq_stock_reservations_user_product", table_name="stock_reservations")
+    op.drop_table("stock_reservations")
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.drop_column("reserved")
@@ -0,0 +1,28 @@
+"""orders created_at index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the admin order listing's keyset (created_at, id)."""
+    op.create_index("ix_orders_created", "orders", ["created_at", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the admin listing index."""
+    op.drop_index("ix_orders_created", table_name="orders", if_exists=True)
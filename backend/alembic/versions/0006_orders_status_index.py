@@ -0,0 +1,28 @@
+"""orders status index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the admin order listing filtered by status."""
+    op.create_index("ix_orders_status_created", "orders", ["status", "created_at", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the status listing index."""
+    op.drop_index("ix_orders_status_created", table_name="orders", if_exists=True)
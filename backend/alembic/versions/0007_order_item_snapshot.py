@@ -0,0 +1,48 @@
+"""order item product snapshot
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_SNAPSHOT_COLUMNS = ("product_name", "product_slug", "product_image_url", "category_name")
+
+
+def upgrade() -> None:
+    """Store a product snapshot on each order line and backfill it from the catalog."""
+    for name in _SNAPSHOT_COLUMNS:
+        op.add_column("order_items", sa.Column(name, sa.String(), nullable=False, server_default=""))
+    # Lines whose product was already deleted keep empty strings.
+    op.execute(
+        """
+        UPDATE order_items SET
+            product_name = COALESCE((SELECT p.name FROM products p WHERE p.id = order_items.product_id), ''),
+            product_slug = COALESCE((SELECT p.slug FROM products p WHERE p.id = order_items.product_id), ''),
+            product_image_url = COALESCE(
+                (SELECT p.image_url FROM products p WHERE p.id = order_items.product_id), ''
+            ),
+            category_name = COALESCE((
+                SELECT c.name FROM products p JOIN categories c ON c.id = p.category_id
+                WHERE p.id = order_items.product_id
+            ), '')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the snapshot columns."""
+    with op.batch_alter_table("order_items") as batch_op:
+        for name in _SNAPSHOT_COLUMNS:
+            batch_op.drop_column(name)
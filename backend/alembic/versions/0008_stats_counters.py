@@ -0,0 +1,74 @@
+"""stats counters and revenue rollups
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _bucket_starts(created_at) -> dict[str, datetime]:
+    if not isinstance(created_at, datetime):
+        created_at = datetime.fromisoformat(created_at)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    hour = created_at.replace(minute=0, second=0, microsecond=0)
+    return {"hour": hour, "day": hour.replace(hour=0)}
+
+
+def upgrade() -> None:
+    """Add the dashboard counters and rollups, filled from the existing rows."""
+    counters = op.create_table(
+        "stat_counters",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    rollups = op.create_table(
+        "revenue_rollups",
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("granularity", "bucket_start"),
+    )
+
+    bind = op.get_bind()
+    orders, revenue = bind.execute(sa.text("SELECT COUNT(*), COALESCE(SUM(total), 0) FROM orders")).one()
+    op.bulk_insert(counters, [
+        {"name": "orders", "value": orders},
+        {"name": "revenue", "value": revenue},
+        {"name": "users", "value": bind.execute(sa.text("SELECT COUNT(*) FROM users")).scalar()},
+        {"name": "products", "value": bind.execute(sa.text("SELECT COUNT(*) FROM products")).scalar()},
+    ])
+
+    buckets = defaultdict(lambda: [0, 0.0])
+    for created_at, total in bind.execute(sa.text("SELECT created_at, total FROM orders WHERE created_at IS NOT NULL")):
+        for granularity, start in _bucket_starts(created_at).items():
+            bucket = buckets[granularity, start]
+            bucket[0] += 1
+            bucket[1] += total
+    if buckets:
+        op.bulk_insert(rollups, [
+            {"granularity": granularity, "bucket_start": start, "orders": count, "revenue": amount}
+            for (granularity, start), (count, amount) in buckets.items()
+        ])
+
+
+def downgrade() -> None:
+    """Drop the counters and rollups."""
+    op.drop_table("revenue_rollups")
+    op.drop_table("stat_counters")
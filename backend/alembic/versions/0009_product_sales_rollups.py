@@ -0,0 +1,67 @@
+"""product sales rollups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _day(created_at) -> datetime:
+    if not isinstance(created_at, datetime):
+        created_at = datetime.fromisoformat(created_at)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def upgrade() -> None:
+    """Add daily units and revenue per product, filled from the existing order lines."""
+    rollups = op.create_table(
+        "product_sales_rollups",
+        sa.Column("day", sa.DateTime(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("category_name", sa.String(), nullable=False),
+        sa.Column("product_name", sa.String(), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "product_id", "category_name"),
+    )
+
+    sales = {}
+    result = op.get_bind().execute(sa.text(
+        """
+        SELECT o.created_at, i.product_id, i.category_name, i.product_name, i.quantity, i.price_at_time
+        FROM order_items i JOIN orders o ON o.id = i.order_id
+        WHERE o.created_at IS NOT NULL
+        """
+    ))
+    for created_at, product_id, category_name, product_name, quantity, price in result:
+        row = sales.setdefault(
+            (_day(created_at), product_id, category_name),
+            {"product_name": product_name, "units": 0, "revenue": 0.0},
+        )
+        row["units"] += quantity
+        row["revenue"] += quantity * price
+    if sales:
+        op.bulk_insert(rollups, [
+            {"day": day, "product_id": product_id, "category_name": category_name, **row}
+            for (day, product_id, category_name), row in sales.items()
+        ])
+
+
+def downgrade() -> None:
+    """Drop the product rollups."""
+    op.drop_table("product_sales_rollups")
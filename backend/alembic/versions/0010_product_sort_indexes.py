@@ -0,0 +1,32 @@
+"""product listing sort indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the product listing keysets so pages are read in order instead of sorted."""
+    op.create_index("ix_products_active_created", "products", ["is_active", "created_at", "id"], if_not_exists=True)
+    op.create_index("ix_products_active_price_id", "products", ["is_active", "price", "id"], if_not_exists=True)
+    op.create_index("ix_products_active_name", "products", ["is_active", "name", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the listing sort indexes."""
+    op.drop_index("ix_products_active_name", table_name="products", if_exists=True)
+    op.drop_index("ix_products_active_price_id", table_name="products", if_exists=True)
+    op.drop_index("ix_products_active_created", table_name="products", if_exists=True)
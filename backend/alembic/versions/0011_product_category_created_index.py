@@ -0,0 +1,33 @@
+"""product category listing index
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index category pages in their default (newest first) order."""
+    op.create_index(
+        "ix_products_active_category_created",
+        "products",
+        ["is_active", "category_id", "created_at", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the category listing index."""
+    op.drop_index("ix_products_active_category_created", table_name="products", if_exists=True)
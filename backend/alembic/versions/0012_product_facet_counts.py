@@ -0,0 +1,70 @@
+"""product facet counts
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_KEY = "category_id = COALESCE({row}.category_id, 0) AND price = {row}.price AND stocked = (COALESCE({row}.stock, 0) > 0)"
+_ADD = """INSERT INTO product_facet_counts (category_id, price, stocked, count)
+        SELECT COALESCE(new.category_id, 0), new.price, COALESCE(new.stock, 0) > 0, 1 WHERE new.is_active
+        ON CONFLICT (category_id, price, stocked) DO UPDATE SET count = count + 1;"""
+_REMOVE = f"""UPDATE product_facet_counts SET count = count - 1 WHERE old.is_active AND {_KEY.format(row="old")};
+        DELETE FROM product_facet_counts WHERE count <= 0 AND {_KEY.format(row="old")};"""
+
+# Every write to products (admin CRUD, imports, checkout stock decrements,
+# raw SQL) moves its row between keys in the same transaction. Updates that
+# leave the key unchanged, such as most stock decrements, skip the trigger.
+_TRIGGERS = {
+    "product_facets_ai": f"AFTER INSERT ON products BEGIN {_ADD} END",
+    "product_facets_ad": f"AFTER DELETE ON products BEGIN {_REMOVE} END",
+    "product_facets_au": f"""AFTER UPDATE OF is_active, category_id, price, stock ON products
+        WHEN old.is_active IS NOT new.is_active
+            OR old.category_id IS NOT new.category_id
+            OR old.price IS NOT new.price
+            OR (COALESCE(old.stock, 0) > 0) IS NOT (COALESCE(new.stock, 0) > 0)
+        BEGIN {_REMOVE} {_ADD} END""",
+}
+
+
+def upgrade() -> None:
+    """Count active products per (category, price, in stock) for the listing facets."""
+    op.create_table(
+        "product_facet_counts",
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("stocked", sa.Boolean(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category_id", "price", "stocked"),
+    )
+    # The table is only maintained on SQLite; other databases compute the
+    # facets from products directly.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "INSERT INTO product_facet_counts (category_id, price, stocked, count)"
+        " SELECT COALESCE(category_id, 0), price, COALESCE(stock, 0) > 0, COUNT(*)"
+        " FROM products WHERE is_active GROUP BY 1, 2, 3"
+    )
+    for name, body in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def downgrade() -> None:
+    """Drop the facet counts and their triggers."""
+    if op.get_bind().dialect.name == "sqlite":
+        for name in _TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("product_facet_counts")
@@ -0,0 +1,33 @@
+"""catalog updated_at
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, Sequence[str], None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record when each product and category last changed, for Last-Modified."""
+    op.add_column("products", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.add_column("categories", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE products SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE categories SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    """Drop the updated_at columns."""
+    for table in ("products", "categories"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,83 @@
+"""product search index
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, Sequence[str], None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_CATEGORY_NAME = "COALESCE((SELECT name FROM categories WHERE id = new.category_id), '')"
+
+# Databases created before this revision may already hold the table and
+# triggers, installed at startup by older code. The table is kept (and
+# rebuilt below); the triggers are dropped and recreated so they always
+# match these definitions.
+_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, description, category_name,
+    tokenize = 'unicode61 remove_diacritics 2'
+)"""
+
+# The index is kept in sync by triggers, so every write path (admin CRUD, bulk
+# loads, raw SQL) updates it in the same transaction as the product row.
+# `remove_diacritics 2` makes "electronique" match "Électronique".
+_TRIGGERS = {
+    "products_fts_ai": f"""AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description, category_name)
+        VALUES (new.id, new.name, COALESCE(new.description, ''), {_CATEGORY_NAME});
+    END""",
+    "products_fts_au": f"""AFTER UPDATE OF name, description, category_id ON products BEGIN
+        UPDATE products_fts
+        SET name = new.name, description = COALESCE(new.description, ''), category_name = {_CATEGORY_NAME}
+        WHERE rowid = new.id;
+    END""",
+    "products_fts_ad": """AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.id;
+    END""",
+    "categories_fts_au": """AFTER UPDATE OF name ON categories BEGIN
+        UPDATE products_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM products WHERE category_id = new.id);
+    END""",
+    "categories_fts_ad": """AFTER DELETE ON categories BEGIN
+        UPDATE products_fts SET category_name = ''
+        WHERE rowid IN (SELECT id FROM products WHERE category_id = old.id);
+    END""",
+}
+
+_REBUILD = [
+    "DELETE FROM products_fts",
+    """INSERT INTO products_fts(rowid, name, description, category_name)
+        SELECT p.id, p.name, COALESCE(p.description, ''), COALESCE(c.name, '')
+        FROM products p LEFT JOIN categories c ON c.id = p.category_id""",
+]
+
+
+def upgrade() -> None:
+    """Full-text index over products, kept in sync by triggers (SQLite FTS5 only)."""
+    # Other databases fall back to substring search (app.services.search).
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(_TABLE)
+    for name, body in _TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(f"CREATE TRIGGER {name} {body}")
+    for statement in _REBUILD:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Drop the search index and its triggers."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS products_fts")
@@ -3,11 +3,84 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     APP_NAME: str = "OnlineShop API"
+    DEBUG: bool = False
     DATABASE_URL: str = "sqlite:///./shop.db"
+    # URL for the async (read-only) routes; derived from DATABASE_URL when unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg). An
+    # in-memory SQLite URL is not shared with the async engine, which would
+    # open its own empty database: use a file.
+    DATABASE_ASYNC_URL: str | None = None
+    # Reads (GET requests) and writes use separate pools. SQLite allows one
+    # writer at a time, so the writer pool is kept small and requests queue
+    # on it (up to DB_POOL_TIMEOUT_SECONDS) instead of on the database lock.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_WRITE_POOL_SIZE: int = 2
+    DB_WRITE_MAX_OVERFLOW: int = 0
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Pragmas applied to every SQLite connection. cache_size follows SQLite's
+    # convention (negative = KiB), mmap_size is in bytes.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_MMAP_SIZE: int = 268435456
     SECRET_KEY: str = "change-me-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 8
+    PASSWORD_HASH_USE_PROCESSES: bool = True
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    # Carts live in a write-behind store and are flushed to cart_items every
+    # CART_FLUSH_INTERVAL_SECONDS. "memory" keeps them per process (single
+    # worker); "shared" uses the key-value server at CART_STORE_URL (needs the
+    # optional redis package), or an in-process stand-in when no URL is set.
+    CART_STORE_BACKEND: str = "memory"
+    CART_STORE_URL: str | None = None
+    CART_STORE_MAX_ENTRIES: int = 50000
+    CART_FLUSH_INTERVAL_SECONDS: float = 5
+    # Adding to the cart holds the stock for STOCK_HOLD_TTL_SECONDS (renewed on
+    # every change to the line); expired holds are released by a sweeper.
+    STOCK_HOLD_TTL_SECONDS: int = 900
+    STOCK_HOLD_SWEEP_INTERVAL_SECONDS: float = 30
+    STOCK_HOLD_SWEEP_BATCH_SIZE: int = 500
+    # Reconciliation recomputes the counters and the rollups of the last
+    # STATS_RECONCILE_DAYS days from the orders table.
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 3600
+    STATS_RECONCILE_DAYS: int = 2
+    STATS_TIMESERIES_MAX_BUCKETS: int = 2000
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300
+    ANALYTICS_MAX_TOP: int = 100
+    ORDER_PAGE_MAX_SIZE: int = 100
+    ORDER_EXPORT_CHUNK_SIZE: int = 1000
+    LOGIN_MAX_ATTEMPTS_PER_EMAIL: int = 10
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 50
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 300
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Request metrics served at /api/metrics. Requests running more than
+    # METRICS_QUERY_BUDGET SQL statements are counted and logged.
+    METRICS_LATENCY_BUCKETS: list[float] = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+    METRICS_QUERY_BUDGET: int = 20
     CORS_ORIGINS: list[str] = ["http://localhost:5173"]
+    PRODUCT_AGGREGATE_CACHE_TTL_SECONDS: int = 30
+    PRICE_FACET_BOUNDARIES: list[float] = [25.0, 50.0, 100.0, 200.0]
+    PRODUCT_IMPORT_CHUNK_SIZE: int = 1000
+    PRODUCT_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    PRODUCT_EXPORT_CHUNK_SIZE: int = 1000
+    CATALOG_CACHE_MAX_ENTRIES: int = 2048
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+    # Cache-Control header per catalog route; an empty value omits the header.
+    CACHE_CONTROL: dict[str, str] = {
+        "products": "public, max-age=30",
+        "product": "public, max-age=60",
+        "categories": "public, max-age=300",
+        "category": "public, max-age=300",
+    }
 
     class Config:
         env_file = ".env"
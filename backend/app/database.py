@@ -1,14 +1,120 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
+_url = make_url(settings.DATABASE_URL)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+# In-memory databases are private to their connection pool, so readers and
+# writers must share the same engine there.
+_is_file_sqlite = _is_sqlite and _url.database not in (None, "", ":memory:") and "mode=memory" not in str(_url)
+
+# Async driver used when DATABASE_ASYNC_URL is not set.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def _async_url() -> str:
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    backend = _url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"Set DATABASE_ASYNC_URL: no default async driver for {backend}")
+    return _url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _set_pragmas(engine: Engine, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # journal_mode is stored in the database file; readers pick it up
+            # from there and cannot set it themselves once query_only is on.
+            if not read_only:
+                cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def _begin_explicitly(engine: Engine, begin: str) -> None:
+    # pysqlite opens transactions itself, and only before DML: a SAVEPOINT
+    # issued first became the outermost transaction and its RELEASE
+    # committed. With its handling off, SQLAlchemy's own begin emits `begin`,
+    # so begin_nested() is a real nested transaction.
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql(begin)
+
+
+def _engine_options(pool_size: int, max_overflow: int) -> dict:
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+    if _is_sqlite:
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        options["pool_pre_ping"] = True
+    return options
+
+
+def _create_engine(pool_size: int, max_overflow: int, read_only: bool) -> Engine:
+    if _is_sqlite and not _is_file_sqlite:
+        new_engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+        _begin_explicitly(new_engine, "BEGIN")
+        return new_engine
+    options = _engine_options(pool_size, max_overflow)
+    if _is_sqlite:
+        options["connect_args"]["check_same_thread"] = False
+    new_engine = create_engine(settings.DATABASE_URL, **options)
+    if _is_sqlite:
+        _set_pragmas(new_engine, read_only)
+        # The writer takes the write lock up front: a transaction that reads
+        # before it writes would otherwise fail with SQLITE_BUSY, busy_timeout
+        # or not, once another writer has committed past its snapshot.
+        _begin_explicitly(new_engine, "BEGIN" if read_only else "BEGIN IMMEDIATE")
+    return new_engine
+
+
+def _create_async_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    if _is_sqlite and not _is_file_sqlite:
+        # An in-memory database belongs to the connection that opened it, so
+        # this engine would see a separate, empty one: the async routes need
+        # a file or a server.
+        return create_async_engine(_async_url())
+    new_engine = create_async_engine(_async_url(), **_engine_options(pool_size, max_overflow))
+    if _is_sqlite:
+        _set_pragmas(new_engine.sync_engine, read_only=True)
+    return new_engine
+
+
+engine = _create_engine(settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW, read_only=False)
+# With WAL, readers run on their own connections alongside the single writer;
+# elsewhere the split only gives reads their own pool.
+read_engine = (
+    _create_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, read_only=True)
+    if _is_file_sqlite or not _is_sqlite
+    else engine
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
+# Read-only async counterpart for the `async def` routes, which are all GETs;
+# writes stay on the sync engine. Connections are only opened on first use.
+async_read_engine = _create_async_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 class Base(DeclarativeBase):
     pass
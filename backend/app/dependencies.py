@@ -1,27 +1,43 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
-from app.models.user import User
-from app.services.auth import decode_access_token
+from app.database import AsyncReadSessionLocal, ReadSessionLocal, SessionLocal
+from app.services.principals import Principal, decode_token_cached, load_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_db():
-    db = SessionLocal()
+# Requests with these methods never write and get a read-only session.
+_READ_METHODS = {"GET", "HEAD"}
+
+
+def get_db(request: Request):
+    db = (ReadSessionLocal if request.method in _READ_METHODS else SessionLocal)()
     try:
         yield db
     finally:
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    payload = decode_access_token(token)
+def get_read_db():
+    """A read-only session regardless of the request method."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """A read-only session for `async def` routes; only GET routes are async."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def _token_user_id(token: str) -> tuple[dict, int]:
+    payload = decode_token_cached(token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,13 +47,36 @@ def get_current_user(
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalide")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return payload, int(user_id)
+
+
+def _check_principal(user: Principal | None, payload: dict) -> Principal:
     if user is None or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Utilisateur introuvable")
+    if payload.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token révoqué")
     return user
 
 
-def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    # Both lookups are served from in-process caches; the session only
+    # touches the database on a principal cache miss.
+    payload, user_id = _token_user_id(token)
+    return _check_principal(load_principal(db, user_id), payload)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    payload, user_id = _token_user_id(token)
+    return _check_principal(await db.run_sync(load_principal, user_id), payload)
+
+
+def get_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Accès admin requis")
     return current_user
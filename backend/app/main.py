@@ -1,10 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.database import async_read_engine
 from app.routers import admin, auth, cart, categories, orders, products
+from app.services.auth import PasswordHasherBusy, password_hasher
+from app.services.cart_store import cart_flusher
+from app.services.metrics import MetricsMiddleware, render_metrics
+from app.services.reservations import reservation_sweeper
+from app.services.stats import stats_reconciler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cart_flusher.start()
+    reservation_sweeper.start()
+    stats_reconciler.start()
+    yield
+    stats_reconciler.stop()
+    reservation_sweeper.stop()
+    cart_flusher.stop()
+    password_hasher.shutdown()
+    await async_read_engine.dispose()
 
-app = FastAPI(title=settings.APP_NAME)
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +36,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps every other middleware.
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service surchargé, veuillez réessayer"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
@@ -25,3 +60,8 @@ app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 @app.get("/api/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/api/metrics", include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,7 +1,9 @@
 from app.models.user import User
 from app.models.category import Category
-from app.models.product import Product
+from app.models.product import Product, ProductFacetCount
 from app.models.cart import CartItem
 from app.models.order import Order, OrderItem
+from app.models.reservation import StockReservation
+from app.models.stats import ProductSalesRollup, RevenueRollup, StatCounter
 
-__all__ = ["User", "Category", "Product", "CartItem", "Order", "OrderItem"]
+__all__ = ["User", "Category", "Product", "ProductFacetCount", "CartItem", "Order", "OrderItem", "StockReservation", "StatCounter", "RevenueRollup", "ProductSalesRollup"]
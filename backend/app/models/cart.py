@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -14,3 +14,8 @@ class CartItem(Base):
 
     user = relationship("User", back_populates="cart_items")
     product = relationship("Product")
+
+    # One line per (user, product); also serves every per-user cart lookup.
+    __table_args__ = (
+        Index("uq_cart_items_user_product", "user_id", "product_id", unique=True),
+    )
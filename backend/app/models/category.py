@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -11,5 +13,10 @@ class Category(Base):
     name = Column(String, unique=True, nullable=False)
     slug = Column(String, unique=True, nullable=False)
     description = Column(String, default="")
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     products = relationship("Product", back_populates="category")
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -19,15 +19,28 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        # Admin order listing: newest first across all users.
+        Index("ix_orders_created", "created_at", "id"),
+        Index("ix_orders_status_created", "status", "created_at", "id"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price_at_time = Column(Float, nullable=False)
+    # Snapshot taken at checkout, so the order reads the same after the
+    # product is renamed, recategorized or deleted.
+    product_name = Column(String, nullable=False, server_default="")
+    product_slug = Column(String, nullable=False, server_default="")
+    product_image_url = Column(String, nullable=False, server_default="")
+    category_name = Column(String, nullable=False, server_default="")
 
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -16,8 +16,49 @@ class Product(Base):
     price = Column(Float, nullable=False)
     image_url = Column(String, default="")
     stock = Column(Integer, default=0)
+    # Sum of the active holds in stock_reservations, kept in step with them.
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Bumped by every ORM and Core update, including stock and hold changes;
+    # the catalog's Last-Modified headers are built from it.
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     category = relationship("Category", back_populates="products")
+
+    @property
+    def available(self) -> int:
+        """Stock that is neither sold nor held in a cart."""
+        return max((self.stock or 0) - (self.reserved or 0), 0)
+
+    # The first serves category/price filtering and covers the facet
+    # aggregate; the others follow the listing sorts' keysets (see _SORTS),
+    # the category one for category pages in their default order.
+    __table_args__ = (
+        Index("ix_products_active_category_price", "is_active", "category_id", "price", "stock"),
+        Index("ix_products_active_category_created", "is_active", "category_id", "created_at", "id"),
+        Index("ix_products_active_created", "is_active", "created_at", "id"),
+        Index("ix_products_active_price_id", "is_active", "price", "id"),
+        Index("ix_products_active_name", "is_active", "name", "id"),
+    )
+
+
+class ProductFacetCount(Base):
+    """Active products per (category, price, in stock) for the listing facets.
+
+    Maintained by triggers on products (see migration 0012) on SQLite, so
+    the facet aggregate reads one row per distinct price instead of one per
+    product. category_id is 0 for products without a category.
+    """
+
+    __tablename__ = "product_facet_counts"
+
+    category_id = Column(Integer, primary_key=True)
+    price = Column(Float, primary_key=True)
+    stocked = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
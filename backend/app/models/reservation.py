@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.database import Base
+
+
+class StockReservation(Base):
+    """Stock held for a user's cart line until `expires_at`."""
+
+    __tablename__ = "stock_reservations"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("uq_stock_reservations_user_product", "user_id", "product_id", unique=True),
+        # The sweeper scans expired holds oldest first.
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+
+from app.database import Base
+
+
+class StatCounter(Base):
+    """Running total behind the admin dashboard, updated in the writer's transaction."""
+
+    __tablename__ = "stat_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+
+
+class RevenueRollup(Base):
+    """Orders and revenue per hour or per day, keyed by the bucket's UTC start."""
+
+    __tablename__ = "revenue_rollups"
+
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class ProductSalesRollup(Base):
+    """Units and revenue per product and UTC day, for the sales analytics."""
+
+    __tablename__ = "product_sales_rollups"
+
+    day = Column(DateTime, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    category_name = Column(String, primary_key=True)
+    product_name = Column(String, nullable=False)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
@@ -15,6 +15,8 @@ class User(Base):
     full_name = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    # Embedded in every JWT; bumping it revokes all tokens issued so far.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     cart_items = relationship("CartItem", back_populates="user", cascade="all, delete-orphan")
@@ -1,158 +1,265 @@
-import re
+from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.config import settings
 from app.dependencies import get_admin_user, get_db
 from app.models.category import Category
-from app.models.order import Order, OrderItem
+from app.models.order import Order
 from app.models.product import Product
 from app.models.user import User
+from app.routers.products import clear_listing_caches
 from app.schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
-from app.schemas.order import OrderResponse, OrderStatusUpdate
-from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from app.schemas.order import OrderListResponse, OrderResponse, OrderStatusUpdate
+from app.schemas.product import ProductCreate, ProductImportResponse, ProductResponse, ProductUpdate
+from app.schemas.user import UserAdminUpdate, UserResponse
+from app.services.analytics import analytics_cache, sales_analytics
+from app.services.auth import password_hasher
+from app.services.cache import catalog_cache, invalidate_categories, invalidate_products
+from app.services.exports import stream_export
+from app.services.orders import (
+    ORDER_EXPORT_FIELDS,
+    list_order_summaries,
+    order_export_query,
+    order_export_records,
+    order_filters,
+)
+from app.services.pagination import InvalidCursorError
+from app.services.principals import Principal, invalidate_principal, revoke_tokens
+from app.services.product_io import (
+    IMPORT_MODES,
+    MEDIA_TYPES,
+    PRODUCT_EXPORT_FIELDS,
+    ProductImporter,
+    UnsupportedFormatError,
+    detect_format,
+    product_export_query,
+    read_rows,
+)
+from app.services.rate_limit import login_throttle
+from app.services.serializers import FastJSONResponse, serialize_order, serialize_product
+from app.services.slugs import flush_with_unique_slug, slugify
+from app.services.stats import GRANULARITIES, bucket_start, increment, read_counters, timeseries, utc_naive
 
 router = APIRouter()
 
 
-def _slugify(text: str) -> str:
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[\s_]+", "-", text)
-    return re.sub(r"-+", "-", text).strip("-")
-
-
-def _product_to_response(product: Product) -> dict:
+# --- Stats ---
+@router.get("/stats")
+def get_stats(
+    _: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    counters = read_counters(db)
     return {
-        "id": product.id,
-        "name": product.name,
-        "slug": product.slug,
-        "description": product.description,
-        "price": product.price,
-        "image_url": product.image_url,
-        "stock": product.stock,
-        "is_active": product.is_active,
-        "category_id": product.category_id,
-        "category_name": product.category.name if product.category else "",
-        "created_at": product.created_at,
+        "total_orders": int(counters["orders"]),
+        "total_revenue": counters["revenue"],
+        "total_users": int(counters["users"]),
+        "total_products": int(counters["products"]),
     }
 
 
-def _order_to_response(order: Order) -> dict:
-    return {
-        "id": order.id,
-        "total": order.total,
-        "status": order.status,
-        "shipping_address": order.shipping_address,
-        "created_at": order.created_at,
-        "items": [
-            {
-                "id": oi.id,
-                "product_id": oi.product_id,
-                "quantity": oi.quantity,
-                "price_at_time": oi.price_at_time,
-                "product": {
-                    "id": oi.product.id,
-                    "name": oi.product.name,
-                    "slug": oi.product.slug,
-                    "description": oi.product.description,
-                    "price": oi.product.price,
-                    "image_url": oi.product.image_url,
-                    "stock": oi.product.stock,
-                    "is_active": oi.product.is_active,
-                    "category_id": oi.product.category_id,
-                    "category_name": oi.product.category.name if oi.product.category else "",
-                    "created_at": oi.product.created_at,
-                },
-            }
-            for oi in order.items
-        ],
-    }
+@router.get("/stats/timeseries")
+def get_stats_timeseries(
+    date_from: datetime | None = Query(None, alias="from"),
+    date_to: datetime | None = Query(None, alias="to"),
+    granularity: str = "hour",
+    _: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    """Orders and revenue per bucket, read from the rollup tables only.
 
+    Defaults to the last 24 hours (hourly) or 30 days (daily); `to` is exclusive.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularité invalide (hour ou day)")
+    date_to = utc_naive(date_to or datetime.now(timezone.utc))
+    date_from = utc_naive(date_from) if date_from else date_to - (timedelta(days=1) if granularity == "hour" else timedelta(days=30))
+    if (date_to - date_from) / GRANULARITIES[granularity] > settings.STATS_TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail="Période trop longue pour cette granularité")
+    return FastJSONResponse({"granularity": granularity, "buckets": timeseries(db, granularity, date_from, date_to)})
 
-# --- Stats ---
-@router.get("/stats")
-def get_stats(
-    _: User = Depends(get_admin_user),
+
+@router.get("/cache/stats")
+def get_cache_stats(_: Principal = Depends(get_admin_user)):
+    return catalog_cache.stats()
+
+
+@router.get("/hashing/stats")
+def get_hashing_stats(_: Principal = Depends(get_admin_user)):
+    return password_hasher.stats()
+
+
+@router.get("/login-throttle/stats")
+def get_login_throttle_stats(_: Principal = Depends(get_admin_user)):
+    return login_throttle.stats()
+
+
+@router.get("/analytics")
+def get_analytics(
+    date_from: datetime | None = Query(None, alias="from"),
+    date_to: datetime | None = Query(None, alias="to"),
+    granularity: str = "day",
+    limit: int = 10,
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    total_orders = db.query(func.count(Order.id)).scalar()
-    total_revenue = db.query(func.coalesce(func.sum(Order.total), 0)).scalar()
-    total_users = db.query(func.count(User.id)).scalar()
-    total_products = db.query(func.count(Product.id)).scalar()
-    return {
-        "total_orders": total_orders,
-        "total_revenue": total_revenue,
-        "total_users": total_users,
-        "total_products": total_products,
-    }
+    """Sales analytics for [from, to), default the last 30 days.
+
+    Both bounds are snapped to the start of their hour or day, so requests
+    for the same period share a cache entry.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularité invalide (hour ou day)")
+    limit = max(1, min(limit, settings.ANALYTICS_MAX_TOP))
+    end = bucket_start(date_to or datetime.now(timezone.utc), granularity)
+    if date_to is None or end < utc_naive(date_to):
+        end += GRANULARITIES[granularity]
+    start = bucket_start(date_from, granularity) if date_from else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="Période invalide")
+    result = analytics_cache.get_or_compute(
+        (granularity, start, end, limit), lambda: sales_analytics(db, start, end, limit)
+    )
+    return FastJSONResponse({"from": start, "to": end, "granularity": granularity, **result})
+
+
+# --- Users management ---
+@router.patch("/users/{user_id}", response_model=UserResponse)
+def update_user(
+    user_id: int,
+    data: UserAdminUpdate,
+    _: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(user, key, value)
+    # Any change to status or privileges invalidates the user's existing tokens.
+    revoke_tokens(user)
+    db.commit()
+    invalidate_principal(user.id)
+    db.refresh(user)
+    return user
 
 
 # --- Products CRUD ---
 @router.post("/products", response_model=ProductResponse, status_code=201)
 def create_product(
     data: ProductCreate,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    slug = _slugify(data.name)
-    existing = db.query(Product).filter(Product.slug == slug).first()
-    if existing:
-        slug = f"{slug}-{db.query(func.count(Product.id)).scalar() + 1}"
-
     product = Product(
         name=data.name,
-        slug=slug,
         description=data.description,
         price=data.price,
         image_url=data.image_url,
         stock=data.stock,
         category_id=data.category_id,
     )
-    db.add(product)
+    flush_with_unique_slug(db, product, slugify(data.name) or "produit")
+    increment(db, products=1)
     db.commit()
+    clear_listing_caches()
+    invalidate_products(product.slug)
     db.refresh(product)
 
     product = db.query(Product).options(joinedload(Product.category)).filter(Product.id == product.id).first()
-    return _product_to_response(product)
+    return FastJSONResponse(serialize_product(product), status_code=201)
+
+
+@router.post("/products/import", response_model=ProductImportResponse)
+def import_products(
+    file: UploadFile,
+    format: str | None = None,
+    mode: str = "upsert",
+    _: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        fmt = detect_format(file.filename, format)
+    except UnsupportedFormatError:
+        raise HTTPException(status_code=400, detail="Format non supporté (csv ou ndjson)")
+    if mode not in IMPORT_MODES:
+        raise HTTPException(status_code=400, detail="Mode d'import invalide (upsert ou create)")
+
+    importer = ProductImporter(db, mode)
+    for line, raw in read_rows(file.file, fmt):
+        importer.add(line, raw)
+    importer.flush()
+
+    if importer.created or importer.updated:
+        clear_listing_caches()
+        catalog_cache.clear()
+    return importer.report()
+
+
+@router.get("/products/export")
+def export_products_file(
+    format: str = "csv",
+    _: Principal = Depends(get_admin_user),
+):
+    try:
+        fmt = detect_format(None, format)
+    except UnsupportedFormatError:
+        raise HTTPException(status_code=400, detail="Format non supporté (csv ou ndjson)")
+    return StreamingResponse(
+        stream_export(
+            fmt, PRODUCT_EXPORT_FIELDS, product_export_query(), Product.id, settings.PRODUCT_EXPORT_CHUNK_SIZE
+        ),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="products.{fmt}"'},
+    )
 
 
 @router.put("/products/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
     data: ProductUpdate,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Produit non trouvé")
 
+    old_slug = product.slug
     update_data = data.model_dump(exclude_unset=True)
     if "name" in update_data:
-        product.slug = _slugify(update_data["name"])
+        flush_with_unique_slug(db, product, slugify(update_data["name"]) or "produit")
     for key, value in update_data.items():
         setattr(product, key, value)
 
     db.commit()
+    clear_listing_caches()
+    invalidate_products(old_slug, product.slug)
     db.refresh(product)
 
     product = db.query(Product).options(joinedload(Product.category)).filter(Product.id == product.id).first()
-    return _product_to_response(product)
+    return FastJSONResponse(serialize_product(product))
 
 
 @router.delete("/products/{product_id}")
 def delete_product(
     product_id: int,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Produit non trouvé")
+    slug = product.slug
     db.delete(product)
+    increment(db, products=-1)
     db.commit()
+    clear_listing_caches()
+    invalidate_products(slug)
     return {"detail": "Produit supprimé"}
 
 
@@ -160,17 +267,17 @@ def delete_product(
 @router.post("/categories", response_model=CategoryResponse, status_code=201)
 def create_category(
     data: CategoryCreate,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    slug = _slugify(data.name)
-    existing = db.query(Category).filter(Category.slug == slug).first()
+    existing = db.query(Category).filter(Category.name == data.name).first()
     if existing:
         raise HTTPException(status_code=400, detail="Cette catégorie existe déjà")
 
-    category = Category(name=data.name, slug=slug, description=data.description)
-    db.add(category)
+    category = Category(name=data.name, description=data.description)
+    flush_with_unique_slug(db, category, slugify(data.name) or "categorie")
     db.commit()
+    catalog_cache.invalidate("categories")
     db.refresh(category)
     return category
 
@@ -179,20 +286,30 @@ def create_category(
 def update_category(
     category_id: int,
     data: CategoryUpdate,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Catégorie non trouvée")
 
+    old_slug = category.slug
     update_data = data.model_dump(exclude_unset=True)
     if "name" in update_data:
-        category.slug = _slugify(update_data["name"])
+        existing = (
+            db.query(Category)
+            .filter(Category.name == update_data["name"], Category.id != category_id)
+            .first()
+        )
+        if existing:
+            raise HTTPException(status_code=400, detail="Cette catégorie existe déjà")
+        flush_with_unique_slug(db, category, slugify(update_data["name"]) or "categorie")
     for key, value in update_data.items():
         setattr(category, key, value)
 
     db.commit()
+    clear_listing_caches()
+    invalidate_categories(category.id, old_slug, category.slug)
     db.refresh(category)
     return category
 
@@ -200,48 +317,100 @@ def update_category(
 @router.delete("/categories/{category_id}")
 def delete_category(
     category_id: int,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Catégorie non trouvée")
+    slug = category.slug
     db.delete(category)
     db.commit()
+    clear_listing_caches()
+    invalidate_categories(category_id, slug)
     return {"detail": "Catégorie supprimée"}
 
 
 # --- Orders management ---
-@router.get("/orders", response_model=list[OrderResponse])
+def _load_order(db: Session, order_id: int) -> Order | None:
+    return (
+        db.query(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.id == order_id)
+        .first()
+    )
+
+
+@router.get("/orders", response_model=OrderListResponse)
 def list_all_orders(
-    _: User = Depends(get_admin_user),
+    limit: int = 20,
+    after: str | None = None,
+    status: str | None = None,
+    user_id: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    min_total: float | None = None,
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    orders = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
-        .order_by(Order.created_at.desc())
-        .all()
+    criteria = order_filters(status, user_id, date_from, date_to, min_total)
+    try:
+        page = list_order_summaries(db, limit, after, *criteria)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return FastJSONResponse(page)
+
+
+@router.get("/orders/export")
+def export_orders_file(
+    format: str = "csv",
+    status: str | None = None,
+    user_id: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    min_total: float | None = None,
+    _: Principal = Depends(get_admin_user),
+):
+    try:
+        fmt = detect_format(None, format)
+    except UnsupportedFormatError:
+        raise HTTPException(status_code=400, detail="Format non supporté (csv ou ndjson)")
+    return StreamingResponse(
+        stream_export(
+            fmt,
+            ORDER_EXPORT_FIELDS,
+            order_export_query(order_filters(status, user_id, date_from, date_to, min_total)),
+            Order.id,
+            settings.ORDER_EXPORT_CHUNK_SIZE,
+            order_export_records,
+        ),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="orders.{fmt}"'},
     )
-    return [_order_to_response(o) for o in orders]
+
+
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+def get_order_admin(
+    order_id: int,
+    _: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    order = _load_order(db, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Commande non trouvée")
+    return FastJSONResponse(serialize_order(order))
 
 
 @router.patch("/orders/{order_id}/status", response_model=OrderResponse)
 def update_order_status(
     order_id: int,
     data: OrderStatusUpdate,
-    _: User = Depends(get_admin_user),
+    _: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    order = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
-        .filter(Order.id == order_id)
-        .first()
-    )
+    order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Commande non trouvée")
     order.status = data.status
     db.commit()
-    db.refresh(order)
-    return _order_to_response(order)
+    return FastJSONResponse(serialize_order(_load_order(db, order_id)))
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_db, get_read_db
 from app.models.user import User
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
-from app.services.auth import create_access_token, hash_password, verify_password
+from app.services.auth import create_access_token, hash_password, needs_rehash, verify_password
+from app.services.principals import Principal
+from app.services.rate_limit import login_throttle
+from app.services.stats import increment
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_data.email).first()
-    if existing:
+def register(
+    user_data: UserCreate,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    # The lookup runs on the read pool and its connection is returned before
+    # hashing; the writer session only checks out a connection for the INSERT,
+    # so a burst of sign-ups cannot hold the writer pool while bcrypt runs.
+    existing = read_db.scalar(select(User.id).where(User.email == user_data.email))
+    read_db.close()
+    if existing is not None:
         raise HTTPException(status_code=400, detail="Cet email est déjà utilisé")
 
     user = User(
@@ -23,21 +36,48 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         full_name=user_data.full_name,
     )
     db.add(user)
-    db.commit()
+    increment(db, users=1)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Cet email est déjà utilisé")
     db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
+def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    retry_after = login_throttle.check(form_data.username, request.client.host if request.client else None)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de tentatives de connexion, réessayez plus tard",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    # Same as register: no connection is held while bcrypt runs.
+    user = read_db.execute(
+        select(User.id, User.hashed_password, User.token_version).where(User.email == form_data.username)
+    ).first()
+    read_db.close()
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
 
-    access_token = create_access_token({"sub": str(user.id)})
+    if needs_rehash(user.hashed_password):
+        hashed_password = hash_password(form_data.password)
+        db.execute(update(User).where(User.id == user.id).values(hashed_password=hashed_password))
+        db.commit()
+
+    access_token = create_access_token({"sub": str(user.id), "ver": user.token_version or 0})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: Principal = Depends(get_current_user)):
     return current_user
@@ -1,122 +1,202 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.dependencies import get_current_user, get_db
-from app.models.cart import CartItem
+from app.dependencies import get_async_db, get_current_user, get_current_user_async, get_db
 from app.models.product import Product
-from app.models.user import User
-from app.schemas.cart import CartItemAdd, CartItemUpdate, CartResponse
+from app.schemas.cart import CartBatch, CartItemAdd, CartItemUpdate, CartResponse, CartSummaryResponse
+from app.services.cart_store import Lines, get_cart_lines, save_cart_lines
+from app.services.principals import Principal
+from app.services.reservations import InsufficientStockError, hold_stock, release_holds
+from app.services.serializers import FastJSONResponse, serialize_cart
 
 router = APIRouter()
 
+# ?view= on mutation endpoints: "full" returns the whole cart, "summary" only
+# the counts and total, which skips loading the products.
+_VIEWS = ("full", "summary")
+
+
+def _build_cart_response(db: Session, lines: Lines) -> FastJSONResponse:
+    products = {}
+    if lines:
+        products = {
+            product.id: product
+            for product in db.query(Product)
+            .options(joinedload(Product.category))
+            .filter(Product.id.in_(lines))
+        }
+    return FastJSONResponse(serialize_cart(lines, products))
+
+
+def _cart_summary(db: Session, lines: Lines) -> dict:
+    prices = dict(db.query(Product.id, Product.price).filter(Product.id.in_(lines)).all()) if lines else {}
+    item_count = quantity = 0
+    total = 0.0
+    for product_id, line_quantity in lines.items():
+        if product_id in prices:
+            item_count += 1
+            quantity += line_quantity
+            total += prices[product_id] * line_quantity
+    return {"item_count": item_count, "quantity": quantity, "total": total}
+
+
+def _cart_response(db: Session, lines: Lines, view: str) -> FastJSONResponse:
+    if view == "summary":
+        return FastJSONResponse(_cart_summary(db, lines))
+    return _build_cart_response(db, lines)
+
+
+def _hold(db: Session, user_id: int, quantities: dict[int, int]) -> None:
+    try:
+        hold_stock(db, user_id, quantities)
+    except InsufficientStockError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Stock insuffisant : {exc.product_id}")
+    db.commit()
+
 
-def _build_cart_response(db: Session, user_id: int) -> dict:
-    items = (
-        db.query(CartItem)
-        .options(joinedload(CartItem.product).joinedload(Product.category))
-        .filter(CartItem.user_id == user_id)
-        .all()
-    )
-    total = sum(item.product.price * item.quantity for item in items)
-
-    cart_items = []
-    for item in items:
-        cart_items.append({
-            "id": item.id,
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "product": {
-                "id": item.product.id,
-                "name": item.product.name,
-                "slug": item.product.slug,
-                "description": item.product.description,
-                "price": item.product.price,
-                "image_url": item.product.image_url,
-                "stock": item.product.stock,
-                "is_active": item.product.is_active,
-                "category_id": item.product.category_id,
-                "category_name": item.product.category.name if item.product.category else "",
-                "created_at": item.product.created_at,
-            },
-        })
-
-    return {"items": cart_items, "total": total}
+def _check_view(view: str) -> None:
+    if view not in _VIEWS:
+        raise HTTPException(status_code=400, detail="Vue invalide")
 
 
 @router.get("/", response_model=CartResponse)
-def get_cart(
-    current_user: User = Depends(get_current_user),
+async def get_cart(
+    current_user: Principal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # run_sync runs on the event loop: with the shared (Redis) cart store the
+    # lookup is a blocking round trip there, see KeyValueCartStore.
+    lines = await db.run_sync(get_cart_lines, current_user.id)
+    products = {}
+    if lines:
+        products = {
+            product.id: product
+            for product in await db.scalars(
+                select(Product).options(joinedload(Product.category)).where(Product.id.in_(lines))
+            )
+        }
+    return FastJSONResponse(serialize_cart(lines, products))
+
+
+@router.get("/summary", response_model=CartSummaryResponse)
+def get_cart_summary(
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return _build_cart_response(db, current_user.id)
+    return FastJSONResponse(_cart_summary(db, get_cart_lines(db, current_user.id)))
 
 
-@router.post("/items", response_model=CartResponse)
+@router.post("/items", response_model=CartResponse | CartSummaryResponse)
 def add_to_cart(
     data: CartItemAdd,
-    current_user: User = Depends(get_current_user),
+    view: str = "full",
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    product = db.query(Product).filter(Product.id == data.product_id, Product.is_active == True).first()
-    if not product:
+    _check_view(view)
+    product_id = db.query(Product.id).filter(Product.id == data.product_id, Product.is_active == True).scalar()
+    if product_id is None:
         raise HTTPException(status_code=404, detail="Produit non trouvé")
-    if product.stock < data.quantity:
-        raise HTTPException(status_code=400, detail="Stock insuffisant")
-
-    existing = (
-        db.query(CartItem)
-        .filter(CartItem.user_id == current_user.id, CartItem.product_id == data.product_id)
-        .first()
-    )
-    if existing:
-        existing.quantity += data.quantity
-    else:
-        item = CartItem(user_id=current_user.id, product_id=data.product_id, quantity=data.quantity)
-        db.add(item)
 
-    db.commit()
-    return _build_cart_response(db, current_user.id)
+    lines = get_cart_lines(db, current_user.id)
+    quantity = lines.get(product_id, 0) + data.quantity
+    _hold(db, current_user.id, {product_id: quantity})
+    lines[product_id] = quantity
+    save_cart_lines(current_user.id, lines)
+    return _cart_response(db, lines, view)
 
 
-@router.patch("/items/{item_id}", response_model=CartResponse)
+@router.post("/batch", response_model=CartResponse | CartSummaryResponse)
+def apply_cart_batch(
+    data: CartBatch,
+    view: str = "full",
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Apply add/set/remove operations, in order, as a single update.
+
+    Operations address lines by product_id; "set" with a quantity below 1
+    removes the line. Holds are adjusted to the final quantities in one
+    transaction, so the whole batch is rejected if any line ends up above
+    what is available.
+    """
+    _check_view(view)
+    quantities = get_cart_lines(db, current_user.id)
+    for operation in data.operations:
+        if operation.op == "remove":
+            quantities.pop(operation.product_id, None)
+            continue
+        if operation.op == "add":
+            if operation.quantity < 1:
+                raise HTTPException(status_code=400, detail="Quantité invalide")
+            quantities[operation.product_id] = quantities.get(operation.product_id, 0) + operation.quantity
+        elif operation.quantity < 1:
+            quantities.pop(operation.product_id, None)
+        else:
+            quantities[operation.product_id] = operation.quantity
+
+    touched = {operation.product_id for operation in data.operations}
+    wanted = {product_id: quantity for product_id, quantity in quantities.items() if product_id in touched}
+    if wanted:
+        active = set(db.scalars(select(Product.id).where(Product.id.in_(wanted), Product.is_active == True)))
+        for product_id in wanted:
+            if product_id not in active:
+                raise HTTPException(status_code=404, detail=f"Produit non trouvé : {product_id}")
+
+    _hold(db, current_user.id, {product_id: quantities.get(product_id, 0) for product_id in touched})
+    save_cart_lines(current_user.id, quantities)
+    return _cart_response(db, quantities, view)
+
+
+@router.patch("/items/{item_id}", response_model=CartResponse | CartSummaryResponse)
 def update_cart_item(
     item_id: int,
     data: CartItemUpdate,
-    current_user: User = Depends(get_current_user),
+    view: str = "full",
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    item = db.query(CartItem).filter(CartItem.id == item_id, CartItem.user_id == current_user.id).first()
-    if not item:
+    _check_view(view)
+    lines = get_cart_lines(db, current_user.id)
+    if item_id not in lines:
         raise HTTPException(status_code=404, detail="Article non trouvé")
 
     if data.quantity < 1:
-        db.delete(item)
+        del lines[item_id]
     else:
-        item.quantity = data.quantity
+        lines[item_id] = data.quantity
 
-    db.commit()
-    return _build_cart_response(db, current_user.id)
+    _hold(db, current_user.id, {item_id: lines.get(item_id, 0)})
+    save_cart_lines(current_user.id, lines)
+    return _cart_response(db, lines, view)
 
 
-@router.delete("/items/{item_id}", response_model=CartResponse)
+@router.delete("/items/{item_id}", response_model=CartResponse | CartSummaryResponse)
 def remove_cart_item(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    view: str = "full",
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    item = db.query(CartItem).filter(CartItem.id == item_id, CartItem.user_id == current_user.id).first()
-    if not item:
+    _check_view(view)
+    lines = get_cart_lines(db, current_user.id)
+    if item_id not in lines:
         raise HTTPException(status_code=404, detail="Article non trouvé")
-    db.delete(item)
-    db.commit()
-    return _build_cart_response(db, current_user.id)
+    del lines[item_id]
+    _hold(db, current_user.id, {item_id: 0})
+    save_cart_lines(current_user.id, lines)
+    return _cart_response(db, lines, view)
 
 
 @router.delete("/", response_model=CartResponse)
 def clear_cart(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
+    release_holds(db, current_user.id)
     db.commit()
-    return {"items": [], "total": 0}
+    save_cart_lines(current_user.id, {})
+    return FastJSONResponse(serialize_cart({}, {}))
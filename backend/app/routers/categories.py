@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.dependencies import get_db
 from app.models.category import Category
 from app.schemas.category import CategoryResponse
+from app.services.cache import cached_response, catalog_cache, newest_update
+from app.services.serializers import serialize_category
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[CategoryResponse])
-def list_categories(db: Session = Depends(get_db)):
-    return db.query(Category).all()
+def list_categories(request: Request, db: Session = Depends(get_db)):
+    key = ("categories",)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        categories = db.query(Category).all()
+        payload = [serialize_category(c) for c in categories]
+        body = catalog_cache.store(key, payload, newest_update(categories), ["categories"], generation)
+    return cached_response(request, body, settings.CACHE_CONTROL.get("categories", ""))
 
 
 @router.get("/{slug}", response_model=CategoryResponse)
-def get_category(slug: str, db: Session = Depends(get_db)):
-    category = db.query(Category).filter(Category.slug == slug).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Catégorie non trouvée")
-    return category
+def get_category(slug: str, request: Request, db: Session = Depends(get_db)):
+    key = ("category", slug)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        category = db.query(Category).filter(Category.slug == slug).first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Catégorie non trouvée")
+        body = catalog_cache.store(
+            key, serialize_category(category), newest_update([category]), [f"category:{slug}"], generation
+        )
+    return cached_response(request, body, settings.CACHE_CONTROL.get("category", ""))
@@ -1,127 +1,115 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.dependencies import get_current_user, get_db
-from app.models.cart import CartItem
+from app.dependencies import get_async_db, get_current_user, get_current_user_async, get_db
 from app.models.order import Order, OrderItem
 from app.models.product import Product
-from app.models.user import User
-from app.schemas.order import OrderCreate, OrderResponse
+from app.schemas.order import OrderCreate, OrderListResponse, OrderResponse
+from app.services.cache import catalog_cache
+from app.services.cart_store import get_cart_lines, save_cart_lines, write_cart_lines
+from app.services.orders import list_order_summaries
+from app.services.pagination import InvalidCursorError
+from app.services.principals import Principal
+from app.services.reservations import InsufficientStockError, convert_holds
+from app.services.serializers import FastJSONResponse, serialize_order
+from app.services.stats import record_order
 
 router = APIRouter()
 
 
-def _order_to_response(order: Order) -> dict:
-    return {
-        "id": order.id,
-        "total": order.total,
-        "status": order.status,
-        "shipping_address": order.shipping_address,
-        "created_at": order.created_at,
-        "items": [
-            {
-                "id": oi.id,
-                "product_id": oi.product_id,
-                "quantity": oi.quantity,
-                "price_at_time": oi.price_at_time,
-                "product": {
-                    "id": oi.product.id,
-                    "name": oi.product.name,
-                    "slug": oi.product.slug,
-                    "description": oi.product.description,
-                    "price": oi.product.price,
-                    "image_url": oi.product.image_url,
-                    "stock": oi.product.stock,
-                    "is_active": oi.product.is_active,
-                    "category_id": oi.product.category_id,
-                    "category_name": oi.product.category.name if oi.product.category else "",
-                    "created_at": oi.product.created_at,
-                },
-            }
-            for oi in order.items
-        ],
-    }
-
-
 @router.post("/", response_model=OrderResponse, status_code=201)
 def create_order(
     data: OrderCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    cart_items = (
-        db.query(CartItem)
-        .options(joinedload(CartItem.product))
-        .filter(CartItem.user_id == current_user.id)
-        .all()
-    )
+    lines = get_cart_lines(db, current_user.id)
+    products = {}
+    if lines:
+        products = {
+            product.id: product
+            for product in db.query(Product).options(joinedload(Product.category)).filter(Product.id.in_(lines))
+        }
+    cart_items = [(products[product_id], quantity) for product_id, quantity in lines.items() if product_id in products]
     if not cart_items:
         raise HTTPException(status_code=400, detail="Le panier est vide")
 
+    # Conditional decrements in id order, taken from the cart's holds first:
+    # no read-modify-write race, and concurrent checkouts lock rows in the same order.
+    try:
+        convert_holds(db, current_user.id, {product.id: quantity for product, quantity in cart_items})
+    except InsufficientStockError as exc:
+        name = products[exc.product_id].name
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Stock insuffisant pour {name}")
+
     total = 0.0
     order_items = []
-    for ci in cart_items:
-        if ci.product.stock < ci.quantity:
-            raise HTTPException(status_code=400, detail=f"Stock insuffisant pour {ci.product.name}")
-        ci.product.stock -= ci.quantity
-        line_total = ci.product.price * ci.quantity
+    for product, quantity in cart_items:
+        line_total = product.price * quantity
         total += line_total
-        order_items.append(
-            OrderItem(
-                product_id=ci.product_id,
-                quantity=ci.quantity,
-                price_at_time=ci.product.price,
-            )
-        )
+        # Snapshot of the product as sold; order reads never join products.
+        order_items.append({
+            "product_id": product.id,
+            "quantity": quantity,
+            "price_at_time": product.price,
+            "product_name": product.name,
+            "product_slug": product.slug,
+            "product_image_url": product.image_url or "",
+            "category_name": product.category.name if product.category else "",
+        })
 
     order = Order(
         user_id=current_user.id,
         total=total,
         shipping_address=data.shipping_address,
-        items=order_items,
     )
     db.add(order)
-    db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
+    db.flush()
+    db.execute(insert(OrderItem), [{"order_id": order.id, **item} for item in order_items])
+    record_order(db, order.created_at, total, order_items)
+    order_id = order.id
+    slugs = [item["product_slug"] for item in order_items]
+    # Checkout flushes the cart: cart_items is emptied in the order's transaction.
+    write_cart_lines(db, current_user.id, {})
     db.commit()
-    db.refresh(order)
+    # Left dirty so a flush that was already in progress cannot bring the old lines back.
+    save_cart_lines(current_user.id, {})
+    # Stock changed: drop the cached detail pages; listings catch up on TTL.
+    catalog_cache.invalidate(*(f"product:{slug}" for slug in slugs))
 
-    # Reload with relationships
-    order = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
-        .filter(Order.id == order.id)
-        .first()
-    )
-    return _order_to_response(order)
+    order = db.query(Order).options(selectinload(Order.items)).filter(Order.id == order_id).first()
+    return FastJSONResponse(serialize_order(order), status_code=201)
 
 
-@router.get("/", response_model=list[OrderResponse])
-def list_orders(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+@router.get("/", response_model=OrderListResponse)
+async def list_orders(
+    limit: int = 20,
+    after: str | None = None,
+    current_user: Principal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    orders = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
-        .filter(Order.user_id == current_user.id)
-        .order_by(Order.created_at.desc())
-        .all()
-    )
-    return [_order_to_response(o) for o in orders]
+    try:
+        page = await db.run_sync(list_order_summaries, limit, after, Order.user_id == current_user.id)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return FastJSONResponse(page)
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     order = (
         db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product).joinedload(Product.category))
+        .options(selectinload(Order.items))
         .filter(Order.id == order_id, Order.user_id == current_user.id)
         .first()
     )
     if not order:
         raise HTTPException(status_code=404, detail="Commande non trouvée")
-    return _order_to_response(order)
+    return FastJSONResponse(serialize_order(order))
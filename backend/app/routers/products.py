@@ -1,68 +1,242 @@
 import math
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import and_, case, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.dependencies import get_db
+from app.config import settings
+from app.dependencies import get_async_db
 from app.models.category import Category
-from app.models.product import Product
+from app.models.product import Product, ProductFacetCount
 from app.schemas.product import ProductListResponse, ProductResponse
+from app.services.cache import cached_response, catalog_cache, newest_update
+from app.services.pagination import InvalidCursorError, ResultCache, decode_cursor, encode_cursor, keyset_after
+from app.services.search import build_match_query, fallback_filter, search_hits
+from app.services.serializers import serialize_product
 
 router = APIRouter()
 
+# sort key -> (keyset columns, descending). "relevance" (the default when
+# searching) orders by BM25 rank and paginates by page only.
+_SORTS = {
+    "newest": ([Product.created_at, Product.id], True),
+    "price": ([Product.price, Product.id], False),
+    "price_desc": ([Product.price, Product.id], True),
+    "name": ([Product.name, Product.id], False),
+}
 
-def _product_to_response(product: Product) -> dict:
-    return {
-        "id": product.id,
-        "name": product.name,
-        "slug": product.slug,
-        "description": product.description,
-        "price": product.price,
-        "image_url": product.image_url,
-        "stock": product.stock,
-        "is_active": product.is_active,
-        "category_id": product.category_id,
-        "category_name": product.category.name if product.category else "",
-        "created_at": product.created_at,
-    }
+# Totals and facets depend only on the filters, so every page and sort order
+# of a listing shares them.
+product_count_cache = ResultCache(settings.PRODUCT_AGGREGATE_CACHE_TTL_SECONDS)
+product_facet_cache = ResultCache(settings.PRODUCT_AGGREGATE_CACHE_TTL_SECONDS)
+
+
+def clear_listing_caches() -> None:
+    product_count_cache.clear()
+    product_facet_cache.clear()
 
 
 @router.get("/", response_model=ProductListResponse)
-def list_products(
+async def list_products(
+    request: Request,
     page: int = 1,
     limit: int = 12,
     category: str | None = None,
     search: str | None = None,
-    db: Session = Depends(get_db),
+    min_price: float | None = None,
+    max_price: float | None = None,
+    in_stock: bool = False,
+    sort: str | None = None,
+    after: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Product).options(joinedload(Product.category)).filter(Product.is_active == True)
+    sort = sort or ("relevance" if search else "newest")
+    search = " ".join(search.lower().split()) if search else None
+    filters = (category, search, min_price, max_price, in_stock)
+    key = ("products", page, limit, sort, after, *filters)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        # The listing query is shared with sync callers; run_sync drives it
+        # over the async connection without tying up a worker thread.
+        payload, last_modified = await db.run_sync(_query_products, page, limit, sort, after, *filters)
+        body = catalog_cache.store(key, payload, last_modified, ["products"], generation)
+    return cached_response(request, body, settings.CACHE_CONTROL.get("products", ""))
 
-    if category:
-        query = query.join(Category).filter(Category.slug == category)
 
+def _query_products(
+    db: Session,
+    page: int,
+    limit: int,
+    sort: str,
+    after: str | None,
+    category: str | None,
+    search: str | None,
+    min_price: float | None,
+    max_price: float | None,
+    in_stock: bool,
+) -> tuple[dict, float | None]:
+    """One listing page and the Last-Modified of the products on it."""
+    if sort != "relevance" and sort not in _SORTS:
+        raise HTTPException(status_code=400, detail="Tri invalide")
+    if sort == "relevance" and after:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    base = db.query(Product).filter(Product.is_active == True)
+
+    hits = None
     if search:
-        query = query.filter(Product.name.ilike(f"%{search}%"))
+        if db.get_bind().dialect.name == "sqlite":
+            match = build_match_query(search)
+            if match is None:
+                empty = {"products": [], "total": 0, "page": page, "pages": 0, "next_cursor": None, "facets": None}
+                return empty, None
+            hits = search_hits(match)
+            base = base.join(hits, hits.c.product_id == Product.id)
+        else:
+            base = base.filter(fallback_filter(search))
 
-    total = query.count()
+    price_filter = _price_range(Product.price, min_price, max_price)
+
+    query = base.options(joinedload(Product.category))
+    if category:
+        query = query.join(Category).filter(Category.slug == category)
+    if price_filter is not None:
+        query = query.filter(price_filter)
+    if in_stock:
+        query = query.filter(Product.stock > 0)
+
+    # Cached per filter set so that neither deep pages nor cursor walks pay for
+    # a full COUNT on every request.
+    filters = (category, search, min_price, max_price, in_stock)
+    total = product_count_cache.get_or_compute(filters, query.count)
     pages = math.ceil(total / limit) if limit > 0 else 1
-    products = query.offset((page - 1) * limit).limit(limit).all()
 
-    return {
-        "products": [_product_to_response(p) for p in products],
+    if sort == "relevance":
+        columns = []
+        query = query.order_by(hits.c.rank, Product.id) if hits is not None else query.order_by(Product.id)
+    else:
+        columns, descending = _SORTS[sort]
+        query = query.order_by(*(c.desc() if descending else c.asc() for c in columns))
+
+    if after:
+        try:
+            values = decode_cursor(after, sort, columns)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+        query = query.filter(keyset_after(columns, values, descending))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    rows = query.limit(limit + 1).all()
+    products = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and products and columns:
+        next_cursor = encode_cursor(sort, [getattr(products[-1], c.key) for c in columns])
+
+    payload = {
+        "products": [serialize_product(p) for p in products],
         "total": total,
         "page": page,
         "pages": pages,
+        "next_cursor": next_cursor,
+        "facets": product_facet_cache.get_or_compute(
+            filters, lambda: _compute_facets(base, search, category, min_price, max_price, in_stock)
+        ),
     }
+    return payload, newest_update(products)
 
 
-@router.get("/{slug}", response_model=ProductResponse)
-def get_product(slug: str, db: Session = Depends(get_db)):
-    product = (
-        db.query(Product)
-        .options(joinedload(Product.category))
-        .filter(Product.slug == slug, Product.is_active == True)
-        .first()
+def _price_range(column, min_price: float | None, max_price: float | None):
+    conditions = []
+    if min_price is not None:
+        conditions.append(column >= min_price)
+    if max_price is not None:
+        conditions.append(column <= max_price)
+    return and_(*conditions) if conditions else None
+
+
+def _compute_facets(
+    base, search: str | None, category: str | None, min_price: float | None, max_price: float | None, in_stock: bool
+) -> dict:
+    """Facet counts from one GROUP BY over (category, price bucket, stocked, in price range).
+
+    Each facet applies every active filter except its own, so e.g. the
+    category counts tell the shopper what they would get by switching
+    category while keeping their price and stock filters.
+
+    Without a search, every active product counts, and on SQLite the counts
+    are read from product_facet_counts (one row per category, price and
+    stock state) rather than aggregated over the catalog.
+    """
+    db = base.session
+    if search is None and db.get_bind().dialect.name == "sqlite":
+        category_id, price, stocked = ProductFacetCount.category_id, ProductFacetCount.price, ProductFacetCount.stocked
+        count = func.sum(ProductFacetCount.count)
+        query = db.query(ProductFacetCount)
+    else:
+        category_id, price = Product.category_id, Product.price
+        stocked = case((Product.stock > 0, 1), else_=0)
+        count = func.count(Product.id)
+        query = base
+
+    boundaries = settings.PRICE_FACET_BOUNDARIES
+    bucket = case(
+        *((price < bound, i) for i, bound in enumerate(boundaries)),
+        else_=len(boundaries),
+    ).label("bucket")
+    stocked = stocked.label("stocked")
+    price_filter = _price_range(price, min_price, max_price)
+    in_range = (case((price_filter, 1), else_=0) if price_filter is not None else literal(1)).label("in_range")
+
+    rows = (
+        query.with_entities(category_id, bucket, stocked, in_range, count)
+        .group_by(category_id, bucket, stocked, in_range)
+        .all()
     )
-    if not product:
-        raise HTTPException(status_code=404, detail="Produit non trouvé")
-    return _product_to_response(product)
+    # Grouping on the indexed category_id and resolving names from the small
+    # categories table afterwards keeps the aggregate an index-only scan.
+    names = {c.id: (c.slug, c.name) for c in db.query(Category.id, Category.slug, Category.name)}
+
+    categories: dict[str, dict] = {}
+    bucket_counts = [0] * (len(boundaries) + 1)
+    in_stock_count = 0
+    for category_id, bucket_index, is_stocked, is_in_range, count in rows:
+        slug, name = names.get(category_id, (None, ""))
+        category_ok = category is None or slug == category
+        stock_ok = not in_stock or is_stocked
+        if slug is not None and is_in_range and stock_ok:
+            entry = categories.setdefault(slug, {"slug": slug, "name": name, "count": 0})
+            entry["count"] += count
+        if category_ok and stock_ok:
+            bucket_counts[bucket_index] += count
+        if category_ok and is_in_range and is_stocked:
+            in_stock_count += count
+
+    lower_bounds = [0.0, *boundaries]
+    upper_bounds = [*boundaries, None]
+    return {
+        "categories": sorted(categories.values(), key=lambda c: c["name"]),
+        "price_ranges": [
+            {"min": low, "max": high, "count": count}
+            for low, high, count in zip(lower_bounds, upper_bounds, bucket_counts)
+        ],
+        "in_stock": in_stock_count,
+    }
+
+
+@router.get("/{slug}", response_model=ProductResponse)
+async def get_product(slug: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = ("product", slug)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        product = await db.scalar(
+            select(Product)
+            .options(joinedload(Product.category))
+            .where(Product.slug == slug, Product.is_active == True)
+        )
+        if not product:
+            raise HTTPException(status_code=404, detail="Produit non trouvé")
+        tags = [f"product:{slug}", f"category-products:{product.category_id}"]
+        body = catalog_cache.store(key, serialize_product(product), newest_update([product]), tags, generation)
+    return cached_response(request, body, settings.CACHE_CONTROL.get("product", ""))
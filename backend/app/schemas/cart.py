@@ -1,17 +1,29 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 from app.schemas.product import ProductResponse
 
 
 class CartItemAdd(BaseModel):
     product_id: int
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 
 class CartItemUpdate(BaseModel):
     quantity: int
 
 
+class CartOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    product_id: int
+    quantity: int = 1
+
+
+class CartBatch(BaseModel):
+    operations: list[CartOperation]
+
+
 class CartItemResponse(BaseModel):
     id: int
     product_id: int
@@ -25,3 +37,9 @@ class CartItemResponse(BaseModel):
 class CartResponse(BaseModel):
     items: list[CartItemResponse]
     total: float
+
+
+class CartSummaryResponse(BaseModel):
+    item_count: int
+    quantity: int
+    total: float
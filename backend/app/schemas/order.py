@@ -2,8 +2,6 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
-from app.schemas.product import ProductResponse
-
 
 class OrderCreate(BaseModel):
     shipping_address: str
@@ -14,7 +12,10 @@ class OrderItemResponse(BaseModel):
     product_id: int
     quantity: int
     price_at_time: float
-    product: ProductResponse
+    product_name: str
+    product_slug: str
+    product_image_url: str
+    category_name: str
 
     class Config:
         from_attributes = True
@@ -32,5 +33,19 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class OrderSummary(BaseModel):
+    id: int
+    total: float
+    status: str
+    shipping_address: str
+    created_at: datetime
+    item_count: int
+
+
+class OrderListResponse(BaseModel):
+    orders: list[OrderSummary]
+    next_cursor: str | None = None
+
+
 class OrderStatusUpdate(BaseModel):
     status: str
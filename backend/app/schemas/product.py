@@ -30,6 +30,7 @@ class ProductResponse(BaseModel):
     price: float
     image_url: str
     stock: int
+    available: int
     is_active: bool
     category_id: int | None
     category_name: str
@@ -39,8 +40,51 @@ class ProductResponse(BaseModel):
         from_attributes = True
 
 
+class CategoryFacet(BaseModel):
+    slug: str
+    name: str
+    count: int
+
+
+class PriceRangeFacet(BaseModel):
+    min: float
+    max: float | None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    categories: list[CategoryFacet]
+    price_ranges: list[PriceRangeFacet]
+    in_stock: int
+
+
 class ProductListResponse(BaseModel):
     products: list[ProductResponse]
     total: int
     page: int
     pages: int
+    next_cursor: str | None = None
+    facets: ProductFacets | None = None
+
+
+class ProductImportRow(BaseModel):
+    name: str
+    slug: str | None = None
+    description: str = ""
+    price: float
+    image_url: str = ""
+    stock: int = 0
+    is_active: bool = True
+    category: str | None = None
+
+
+class ProductImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: list[ProductImportError]
@@ -14,6 +14,11 @@ class UserLogin(BaseModel):
     password: str
 
 
+class UserAdminUpdate(BaseModel):
+    is_active: bool | None = None
+    is_admin: bool | None = None
+
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -1,11 +1,22 @@
 """Seed the database with sample data."""
-from app.database import SessionLocal, engine, Base
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+from app.database import SessionLocal
 from app.models import User, Category, Product
 from app.services.auth import hash_password
+from app.services.stats import reconcile_stats
+
+
+def migrate():
+    """Bring the schema up to date with `alembic upgrade head`."""
+    command.upgrade(Config(str(Path(__file__).resolve().parent.parent / "alembic.ini")), "head")
 
 
 def seed():
-    Base.metadata.create_all(bind=engine)
+    migrate()
     db = SessionLocal()
 
     try:
@@ -59,6 +70,7 @@ def seed():
         db.add_all(products)
 
         db.commit()
+        reconcile_stats()
         print("Database seeded successfully!")
         print("Admin: admin@onlineshop.com / admin123")
         print("User:  user@onlineshop.com / user123")
@@ -0,0 +1,104 @@
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.order import Order, OrderItem
+from app.models.stats import ProductSalesRollup, RevenueRollup
+from app.services.pagination import ResultCache
+from app.services.stats import bucket_start
+
+analytics_cache = ResultCache(settings.ANALYTICS_CACHE_TTL_SECONDS, max_entries=256)
+
+
+def _line_sales(db: Session, start: datetime, end: datetime) -> list:
+    """(product_id, product_name, category_name, units, revenue) from the raw order lines in [start, end)."""
+    if start >= end:
+        return []
+    return db.execute(
+        select(
+            OrderItem.product_id,
+            func.max(OrderItem.product_name),
+            OrderItem.category_name,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.price_at_time),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.created_at >= start, Order.created_at < end)
+        .group_by(OrderItem.product_id, OrderItem.category_name)
+    ).all()
+
+
+def _rollup_sales(db: Session, start: datetime, end: datetime) -> list:
+    """Same shape as _line_sales, from the daily product rollups for whole days in [start, end)."""
+    return db.execute(
+        select(
+            ProductSalesRollup.product_id,
+            func.max(ProductSalesRollup.product_name),
+            ProductSalesRollup.category_name,
+            func.sum(ProductSalesRollup.units),
+            func.sum(ProductSalesRollup.revenue),
+        )
+        .where(ProductSalesRollup.day >= start, ProductSalesRollup.day < end)
+        .group_by(ProductSalesRollup.product_id, ProductSalesRollup.category_name)
+    ).all()
+
+
+def sales_analytics(db: Session, start: datetime, end: datetime, limit: int) -> dict:
+    """Top products, revenue per category and average order value for orders in [start, end).
+
+    `start` and `end` must be whole hours (UTC, naive). Whole days are read
+    from the daily product rollups and only the partial days at either end
+    from order_items, so the cost grows with the number of days and products
+    rather than with the number of order lines. Order count and revenue come
+    from the hourly revenue rollups.
+    """
+    first_day = bucket_start(start, "day")
+    if first_day < start:
+        first_day += timedelta(days=1)
+    last_day = bucket_start(end, "day")
+    if first_day < last_day:
+        rows = [
+            *_line_sales(db, start, first_day),
+            *_rollup_sales(db, first_day, last_day),
+            *_line_sales(db, last_day, end),
+        ]
+    else:
+        rows = _line_sales(db, start, end)
+
+    order_count, order_total = db.execute(
+        select(func.coalesce(func.sum(RevenueRollup.orders), 0), func.coalesce(func.sum(RevenueRollup.revenue), 0.0))
+        .where(
+            RevenueRollup.granularity == "hour",
+            RevenueRollup.bucket_start >= start,
+            RevenueRollup.bucket_start < end,
+        )
+    ).one()
+
+    products: dict[int, dict] = {}
+    categories: dict[str, dict] = defaultdict(lambda: {"units": 0, "revenue": 0.0})
+    for product_id, name, category_name, units, amount in rows:
+        product = products.setdefault(
+            product_id, {"product_id": product_id, "product_name": name, "units": 0, "revenue": 0.0}
+        )
+        product["units"] += units
+        product["revenue"] += amount
+        category = categories[category_name or ""]
+        category["units"] += units
+        category["revenue"] += amount
+
+    return {
+        "orders": order_count,
+        "revenue": order_total,
+        "average_order_value": order_total / order_count if order_count else 0.0,
+        "top_by_revenue": heapq.nlargest(limit, products.values(), key=lambda p: p["revenue"]),
+        "top_by_units": heapq.nlargest(limit, products.values(), key=lambda p: p["units"]),
+        "revenue_by_category": sorted(
+            ({"category_name": name, **totals} for name, totals in categories.items()),
+            key=lambda c: c["revenue"],
+            reverse=True,
+        ),
+    }
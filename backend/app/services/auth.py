@@ -1,3 +1,7 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -6,12 +10,110 @@ from jose import JWTError, jwt
 from app.config import settings
 
 
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when the hashing pool is saturated."""
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _verify(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited worker pool.
+
+    At most `workers + max_pending` calls may be in flight; any call beyond
+    that fails fast with PasswordHasherBusy so a login burst cannot tie up the
+    request threadpool that every other sync route shares.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool = True):
+        self.workers = workers
+        self.max_in_flight = workers + max_pending
+        self.use_processes = use_processes
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+        start = time.perf_counter()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenExecutor:
+            # A worker died; start a fresh pool on the next call.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_latency_ms": self.total_seconds / self.completed * 1000 if self.completed else 0.0,
+                "max_latency_ms": self.max_seconds * 1000,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            # "spawn" avoids forking a process that already runs server threads.
+            return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.PASSWORD_HASH_USE_PROCESSES,
+)
+
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return password_hasher.run(_hash, password.encode("utf-8"), settings.BCRYPT_ROUNDS).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return password_hasher.run(_verify, plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different cost than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
 
 
 def create_access_token(data: dict) -> str:
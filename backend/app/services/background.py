@@ -0,0 +1,41 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs `fn` every `interval` seconds on a daemon thread.
+
+    With `run_on_stop`, stop() runs `fn` one last time so work queued since
+    the previous run is not lost at shutdown.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object], run_on_stop: bool = True):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.run_on_stop = run_on_stop
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.run_on_stop:
+            self.fn()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.fn()
+            except Exception:
+                logger.exception("%s failed", self.name)
@@ -0,0 +1,254 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Hashable, Iterable, NamedTuple
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.services.serializers import dump_json
+
+
+class CachedBody(NamedTuple):
+    content: bytes
+    etag: str
+    last_modified: float | None
+
+    @classmethod
+    def build(cls, content: bytes, last_modified: float | None) -> "CachedBody":
+        etag = '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+        return cls(content, etag, last_modified)
+
+
+def newest_update(rows: Iterable[Any]) -> float | None:
+    """POSIX time of the newest `updated_at` among `rows` and their categories.
+
+    None when there are no rows (or none has a timestamp), in which case the
+    response carries no Last-Modified. Naive datetimes are UTC, as stored.
+    """
+    newest = None
+    for row in rows:
+        for stamp in (row.updated_at, getattr(getattr(row, "category", None), "updated_at", None)):
+            if stamp is not None and (newest is None or stamp > newest):
+                newest = stamp
+    if newest is None:
+        return None
+    if newest.tzinfo is None:
+        newest = newest.replace(tzinfo=timezone.utc)
+    return newest.timestamp()
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache:
+    """Bounded LRU cache of serialized responses with TTL and tag invalidation.
+
+    Every entry is stored under one or more tags (e.g. ``product:<slug>``) so
+    writers can drop exactly the entries they made stale.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_skips = 0
+        self._entries: OrderedDict[Hashable, tuple[float, CachedBody, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+        # Invalidation sequence: each invalidate()/clear() bumps it, and every
+        # tag remembers the value at its last invalidation.
+        self._sequence = 0
+        self._cleared_at = 0
+        self._invalidated_at: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CachedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def lookup(self, key: Hashable) -> tuple[CachedBody | None, int]:
+        """The entry for `key`, or None and the generation to pass to store().
+
+        The generation is taken before the caller reads the database, so an
+        invalidation that lands while it builds the payload keeps the
+        (possibly stale) result out of the cache.
+        """
+        body = self.get(key)
+        return body, self.generation()
+
+    def store(
+        self,
+        key: Hashable,
+        payload: Any,
+        last_modified: float | None,
+        tags: Iterable[str] = (),
+        generation: int | None = None,
+    ) -> CachedBody:
+        """Serialize `payload`, cache it (see set()) and return the body."""
+        body = CachedBody.build(dump_json(payload), last_modified)
+        self.set(key, body, tags, generation)
+        return body
+
+    def generation(self) -> int:
+        """Token to take before reading the data an entry is built from; see set()."""
+        with self._lock:
+            return self._sequence
+
+    def set(self, key: Hashable, value: CachedBody, tags: Iterable[str] = (), generation: int | None = None) -> None:
+        """Store `value` under `tags`.
+
+        With `generation`, the value is dropped instead if the cache was
+        cleared or any of `tags` was invalidated since that token was taken,
+        since it may have been built from data the invalidation made stale.
+        """
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and (
+                self._cleared_at > generation
+                or any(self._invalidated_at.get(tag, 0) > generation for tag in tags)
+            ):
+                self.stale_skips += 1
+                return
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            self._sequence += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self._sequence
+                for key in self._tags.pop(tag, ()):
+                    self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sequence += 1
+            self._cleared_at = self._sequence
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_skips": self.stale_skips,
+            }
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+catalog_cache = ResponseCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+def _not_modified(request: Request, body: CachedBody) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison function (RFC 9110 13.1.2).
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return body.etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and body.last_modified is not None:
+        try:
+            return int(body.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cached_response(request: Request, body: CachedBody, cache_control: str = "") -> Response:
+    """Answer with a body from ResponseCache.lookup() or store().
+
+    A conditional request matching its ETag / Last-Modified gets a bodiless
+    304. That skips the database only when the entry was already cached; on
+    a miss the route has run its full query to build the body first.
+    """
+    headers = {"ETag": body.etag}
+    if body.last_modified is not None:
+        headers["Last-Modified"] = formatdate(body.last_modified, usegmt=True)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if _not_modified(request, body):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body.content, media_type="application/json", headers=headers)
+
+
+def invalidate_products(*slugs: str) -> None:
+    catalog_cache.invalidate("products", *(f"product:{slug}" for slug in slugs))
+
+
+def invalidate_categories(category_id: int, *slugs: str) -> None:
+    """Drop category entries plus every product payload embedding the category name."""
+    catalog_cache.invalidate(
+        "categories",
+        "products",
+        f"category-products:{category_id}",
+        *(f"category:{slug}" for slug in slugs),
+    )
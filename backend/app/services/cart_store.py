@@ -0,0 +1,237 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Protocol
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.cart import CartItem
+from app.models.product import Product
+from app.services.background import PeriodicTask
+
+# A cart is {product_id: quantity}; a product appears at most once per cart.
+Lines = dict[int, int]
+
+
+class CartStore(Protocol):
+    """Holds carts in front of the cart_items table (write-behind).
+
+    A cart that is not in the store is loaded from cart_items on first use.
+    Writes only touch the store and mark the cart dirty; flush_dirty_carts()
+    later copies dirty carts back to the table.
+    """
+
+    def get(self, user_id: int) -> Lines | None:
+        ...
+
+    def put(self, user_id: int, lines: Lines, dirty: bool = True) -> None:
+        ...
+
+    def pop_dirty(self) -> dict[int, Lines]:
+        """Snapshot the carts changed since the last call and mark them clean.
+
+        The carts stay in the store until finish_flush() is called for them.
+        """
+        ...
+
+    def finish_flush(self, user_ids: list[int], succeeded: bool) -> None:
+        """End a flush started by pop_dirty(); failed carts are marked dirty again."""
+        ...
+
+
+class MemoryCartStore:
+    """Carts in a per-process LRU dict.
+
+    Only clean carts that are not being flushed are evicted, so an unflushed
+    change is never lost to eviction. With several worker processes each one
+    has its own copy; use the key-value store for that deployment.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._carts: OrderedDict[int, Lines] = OrderedDict()
+        self._dirty: set[int] = set()
+        self._flushing: set[int] = set()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Lines | None:
+        with self._lock:
+            lines = self._carts.get(user_id)
+            if lines is None:
+                return None
+            self._carts.move_to_end(user_id)
+            return dict(lines)
+
+    def put(self, user_id: int, lines: Lines, dirty: bool = True) -> None:
+        with self._lock:
+            self._carts[user_id] = dict(lines)
+            self._carts.move_to_end(user_id)
+            if dirty:
+                self._dirty.add(user_id)
+            if len(self._carts) > self.max_entries:
+                pinned = self._dirty | self._flushing
+                for key in [key for key in self._carts if key not in pinned]:
+                    if len(self._carts) <= self.max_entries:
+                        break
+                    del self._carts[key]
+
+    def pop_dirty(self) -> dict[int, Lines]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flushing |= dirty
+            return {user_id: dict(self._carts[user_id]) for user_id in dirty}
+
+    def finish_flush(self, user_ids: list[int], succeeded: bool) -> None:
+        with self._lock:
+            self._flushing.difference_update(user_ids)
+            if not succeeded:
+                self._dirty.update(user_ids)
+
+
+class LocalKeyValue:
+    """In-process stand-in for the get/set/sadd/spop subset of a Redis client."""
+
+    def __init__(self):
+        self._values: dict[str, bytes] = {}
+        self._sets: dict[str, set[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def sadd(self, key: str, *members) -> None:
+        with self._lock:
+            self._sets.setdefault(key, set()).update(str(member).encode() for member in members)
+
+    def spop(self, key: str, count: int) -> list[bytes]:
+        with self._lock:
+            members = self._sets.get(key, set())
+            return [members.pop() for _ in range(min(count, len(members)))]
+
+
+class KeyValueCartStore:
+    """Carts shared by every worker through a key-value server.
+
+    `client` needs get/set/sadd/spop with Redis semantics: a redis.Redis
+    instance works as is, and LocalKeyValue stands in for it locally.
+
+    The client is synchronous. The async get_cart route reaches it through
+    AsyncSession.run_sync, which runs on the event loop, so each Redis round
+    trip blocks the loop for its duration. That is fine for a Redis on the
+    same host or network; a slow or distant server needs an async client.
+    """
+
+    def __init__(self, client, prefix: str = "cart:"):
+        self.client = client
+        self.prefix = prefix
+        self._dirty_key = f"{prefix}dirty"
+
+    def get(self, user_id: int) -> Lines | None:
+        raw = self.client.get(f"{self.prefix}{user_id}")
+        if raw is None:
+            return None
+        return {int(product_id): quantity for product_id, quantity in json.loads(raw).items()}
+
+    def put(self, user_id: int, lines: Lines, dirty: bool = True) -> None:
+        self.client.set(f"{self.prefix}{user_id}", json.dumps(lines).encode())
+        if dirty:
+            self.client.sadd(self._dirty_key, user_id)
+
+    def pop_dirty(self) -> dict[int, Lines]:
+        carts = {}
+        while True:
+            batch = self.client.spop(self._dirty_key, 1000)
+            if not batch:
+                return carts
+            for member in batch:
+                lines = self.get(int(member))
+                if lines is not None:
+                    carts[int(member)] = lines
+
+    def finish_flush(self, user_ids: list[int], succeeded: bool) -> None:
+        # Carts are never evicted here, so only failed ones need restoring.
+        if not succeeded and user_ids:
+            self.client.sadd(self._dirty_key, *user_ids)
+
+
+def _create_store() -> CartStore:
+    if settings.CART_STORE_BACKEND == "memory":
+        return MemoryCartStore(settings.CART_STORE_MAX_ENTRIES)
+    if settings.CART_STORE_BACKEND != "shared":
+        raise ValueError(f"Unknown CART_STORE_BACKEND: {settings.CART_STORE_BACKEND}")
+    if settings.CART_STORE_URL:
+        # Optional dependency: only this deployment needs it.
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("CART_STORE_URL requires the redis package (pip install redis)") from None
+
+        return KeyValueCartStore(redis.Redis.from_url(settings.CART_STORE_URL))
+    return KeyValueCartStore(LocalKeyValue())
+
+
+cart_store = _create_store()
+
+
+def get_cart_lines(db: Session, user_id: int) -> Lines:
+    lines = cart_store.get(user_id)
+    if lines is None:
+        lines = dict(db.execute(
+            select(CartItem.product_id, CartItem.quantity).where(CartItem.user_id == user_id)
+        ).all())
+        cart_store.put(user_id, lines, dirty=False)
+    return lines
+
+
+def save_cart_lines(user_id: int, lines: Lines) -> None:
+    cart_store.put(user_id, {product_id: quantity for product_id, quantity in lines.items() if quantity > 0})
+
+
+def write_cart_lines(db: Session, user_id: int, lines: Lines) -> None:
+    """Replace a user's cart_items rows with `lines`, inside the caller's transaction."""
+    db.execute(delete(CartItem).where(CartItem.user_id == user_id))
+    if not lines:
+        return
+    # Lines whose product was deleted since they were added are dropped.
+    existing = set(db.scalars(select(Product.id).where(Product.id.in_(lines))))
+    rows = [
+        {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+        for product_id, quantity in lines.items()
+        if product_id in existing
+    ]
+    if rows:
+        db.execute(insert(CartItem), rows)
+
+
+def flush_dirty_carts(store: CartStore | None = None) -> int:
+    """Copy every dirty cart back to cart_items in one transaction."""
+    if store is None:
+        store = cart_store
+    carts = store.pop_dirty()
+    if not carts:
+        return 0
+    succeeded = False
+    db = SessionLocal()
+    try:
+        for user_id, lines in carts.items():
+            write_cart_lines(db, user_id, lines)
+        db.commit()
+        succeeded = True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        # On failure the carts are dirty again, so the next flush retries them.
+        store.finish_flush(list(carts), succeeded)
+    return len(carts)
+
+cart_flusher = PeriodicTask("cart-flusher", settings.CART_FLUSH_INTERVAL_SECONDS, flush_dirty_carts)
@@ -0,0 +1,53 @@
+import csv
+import io
+from typing import Callable, Iterator, Sequence
+
+from sqlalchemy import Row, Select
+from sqlalchemy.orm import Session
+
+from app.database import ReadSessionLocal
+from app.services.serializers import dump_json
+
+# Turns one chunk of rows into records keyed by the export fields. It gets the
+# export's session, so it can batch-load whatever the rows do not carry.
+Serializer = Callable[[Session, Sequence[Row]], list[dict]]
+
+
+def stream_export(
+    fmt: str,
+    fields: list[str],
+    query: Select,
+    key_column,
+    chunk_size: int,
+    serialize: Serializer | None = None,
+) -> Iterator[bytes]:
+    """Stream `query` as CSV or NDJSON in `key_column` order, one keyset-paginated chunk at a time.
+
+    `key_column` must be unique and selected by `query` under its own name.
+    Without `serialize`, each record is read off its row by field name. Uses
+    its own session because the generator outlives the request's.
+    """
+    db = ReadSessionLocal()
+    try:
+        if fmt == "csv":
+            yield (",".join(fields) + "\r\n").encode("utf-8")
+        chunk = query.order_by(key_column).limit(chunk_size)
+        last_key = None
+        while True:
+            page = chunk if last_key is None else chunk.where(key_column > last_key)
+            rows = db.execute(page).all()
+            if not rows:
+                break
+            last_key = getattr(rows[-1], key_column.key)
+            if serialize is None:
+                records = [{field: getattr(row, field) for field in fields} for row in rows]
+            else:
+                records = serialize(db, rows)
+            if fmt == "csv":
+                buffer = io.StringIO()
+                csv.DictWriter(buffer, fieldnames=fields).writerows(records)
+                yield buffer.getvalue().encode("utf-8")
+            else:
+                yield b"".join(dump_json(record) + b"\n" for record in records)
+    finally:
+        db.close()
@@ -0,0 +1,240 @@
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """SQL work done on behalf of the current request."""
+
+    __slots__ = ("queries", "sql_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+# Registered on the Engine class so every engine is covered, including the
+# sync engines behind the async ones. Queries outside a request (background
+# tasks, seeding) have no RequestStats and are not counted.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+
+class _RouteMetrics:
+    __slots__ = ("statuses", "buckets", "duration_sum", "count", "queries", "sql_seconds", "over_budget")
+
+    def __init__(self, bucket_count: int):
+        self.statuses: dict[int, int] = {}
+        self.buckets = [0] * (bucket_count + 1)  # last one is +Inf
+        self.duration_sum = 0.0
+        self.count = 0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.over_budget = 0
+
+
+class RequestMetrics:
+    """Latency histogram and SQL totals per (method, route template)."""
+
+    def __init__(self, bounds: list[float], query_budget: int):
+        self.bounds = sorted(bounds)
+        self.query_budget = query_budget
+        self._routes: dict[tuple[str, str], _RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        over_budget = stats.queries > self.query_budget
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[method, route] = _RouteMetrics(len(self.bounds))
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+            metrics.duration_sum += seconds
+            metrics.count += 1
+            metrics.queries += stats.queries
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.over_budget += over_budget
+        if over_budget:
+            logger.warning(
+                "%s %s ran %d SQL queries (budget %d)", method, route, stats.queries, self.query_budget
+            )
+
+    def render(self) -> list[str]:
+        with self._lock:
+            routes = [
+                (method, route, dict(m.statuses), list(m.buckets), m.duration_sum, m.count,
+                 m.queries, m.sql_seconds, m.over_budget)
+                for (method, route), m in sorted(self._routes.items())
+            ]
+        lines = [
+            "# HELP http_requests_total Requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for method, route, statuses, *_ in routes:
+            for status, count in sorted(statuses.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for method, route, _, buckets, duration_sum, count, *_ in routes:
+            cumulative = 0
+            for bound, hits in zip([*self.bounds, "+Inf"], buckets):
+                cumulative += hits
+                labels = _labels(method=method, route=route, le=bound)
+                lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(method=method, route=route)
+            lines.append(f"http_request_duration_seconds_sum{labels} {duration_sum}")
+            lines.append(f"http_request_duration_seconds_count{labels} {count}")
+
+        for name, kind, help_text, index in (
+            ("db_queries_total", "counter", "SQL statements run by requests, by route.", 6),
+            ("db_query_seconds_total", "counter", "Time spent in SQL by requests, by route.", 7),
+            ("http_requests_over_query_budget_total", "counter",
+             "Requests that ran more SQL statements than METRICS_QUERY_BUDGET.", 8),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for row in routes:
+                lines.append(f"{name}{_labels(method=row[0], route=row[1])} {row[index]}")
+        return lines
+
+
+request_metrics = RequestMetrics(settings.METRICS_LATENCY_BUCKETS, settings.METRICS_QUERY_BUDGET)
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _route_template(scope) -> str:
+    """The matched route's path with its parameters put back, e.g. /api/products/{slug}.
+
+    Rebuilt from the request path because a route's own `path` lacks the
+    prefix of the router it was included with.
+    """
+    if "route" not in scope:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    for name, value in (scope.get("path_params") or {}).items():
+        value = str(value)
+        for index in range(len(segments) - 1, -1, -1):
+            if segments[index] == value:
+                segments[index] = f"{{{name}}}"
+                break
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and counts its SQL statements.
+
+    Routes are labelled by their template (e.g. /api/products/{slug}) so the
+    number of series stays bounded; requests that match no route share
+    "unmatched". With DEBUG, responses carry a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.DEBUG:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                        f"total;dur={total_ms:.1f}",
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            request_metrics.observe(
+                scope["method"],
+                _route_template(scope),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of the request metrics and the in-process stats."""
+    from app.database import engine, read_engine
+    from app.services.auth import password_hasher
+    from app.services.cache import catalog_cache
+    from app.services.rate_limit import login_throttle
+
+    lines = request_metrics.render()
+
+    def add(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels) if labels else ''} {value}")
+
+    cache = catalog_cache.stats()
+    add("catalog_cache_entries", "gauge", "Entries in the catalog response cache.", [({}, cache["entries"])])
+    add("catalog_cache_hits_total", "counter", "Catalog response cache hits.", [({}, cache["hits"])])
+    add("catalog_cache_misses_total", "counter", "Catalog response cache misses.", [({}, cache["misses"])])
+    add("catalog_cache_evictions_total", "counter", "Catalog response cache evictions.", [({}, cache["evictions"])])
+
+    hashing = password_hasher.stats()
+    add("password_hash_in_flight", "gauge", "bcrypt calls running or queued.", [({}, hashing["in_flight"])])
+    add("password_hash_completed_total", "counter", "bcrypt calls completed.", [({}, hashing["completed"])])
+    add("password_hash_rejected_total", "counter", "bcrypt calls rejected as busy.", [({}, hashing["rejected"])])
+
+    throttle = login_throttle.stats()
+    add("login_attempts_total", "counter", "Login attempts by throttle outcome.", [
+        ({"outcome": "allowed"}, throttle["allowed"]),
+        ({"outcome": "rejected"}, throttle["rejected"]),
+    ])
+
+    pools = {"write": engine.pool}
+    if read_engine is not engine:
+        pools["read"] = read_engine.pool
+    add("db_pool_checked_out", "gauge", "Connections checked out of each pool.", [
+        ({"pool": name}, pool.checkedout()) for name, pool in pools.items() if hasattr(pool, "checkedout")
+    ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.order import Order, OrderItem
+from app.models.user import User
+from app.services.pagination import decode_cursor, encode_cursor, keyset_after
+from app.services.stats import utc_naive
+
+ORDER_EXPORT_FIELDS = ["id", "created_at", "status", "total", "item_count", "user_id", "user_email", "shipping_address"]
+
+# Order listings are always newest first; id breaks ties between orders
+# created in the same instant so the cursor is unambiguous.
+_SORT = "newest"
+_COLUMNS = [Order.created_at, Order.id]
+
+_item_count = (
+    select(func.count(OrderItem.id))
+    .where(OrderItem.order_id == Order.id)
+    .correlate(Order)
+    .scalar_subquery()
+    .label("item_count")
+)
+
+
+def list_order_summaries(db: Session, limit: int, after: str | None, *criteria) -> dict:
+    """One page of order summaries matching `criteria`, newest first.
+
+    Each row costs an index lookup on orders plus a per-order count on
+    order_items.order_id, so the work is bounded by the page size however
+    many orders or items exist. Raises InvalidCursorError for a bad `after`.
+    """
+    limit = max(1, min(limit, settings.ORDER_PAGE_MAX_SIZE))
+    query = (
+        select(Order.id, Order.total, Order.status, Order.shipping_address, Order.created_at, _item_count)
+        .where(*criteria)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        query = query.where(keyset_after(_COLUMNS, decode_cursor(after, _SORT, _COLUMNS), descending=True))
+
+    rows = db.execute(query).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(_SORT, [page[-1].created_at, page[-1].id])
+    return {"orders": [row._asdict() for row in page], "next_cursor": next_cursor}
+
+
+def order_filters(
+    status: str | None = None,
+    user_id: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    min_total: float | None = None,
+) -> list:
+    """WHERE criteria for the admin order filters; `date_to` is exclusive."""
+    criteria = []
+    if status:
+        criteria.append(Order.status == status)
+    if user_id is not None:
+        criteria.append(Order.user_id == user_id)
+    # created_at is stored as naive UTC and SQLite drops the offset of an
+    # aware bound, so both bounds are converted first.
+    if date_from is not None:
+        criteria.append(Order.created_at >= utc_naive(date_from))
+    if date_to is not None:
+        criteria.append(Order.created_at < utc_naive(date_to))
+    if min_total is not None:
+        criteria.append(Order.total >= min_total)
+    return criteria
+
+
+def order_export_query(criteria: list):
+    """Orders matching `criteria` as exported, for stream_export keyed on Order.id."""
+    return (
+        select(
+            Order.id,
+            Order.created_at,
+            Order.status,
+            Order.total,
+            Order.user_id,
+            User.email.label("user_email"),
+            Order.shipping_address,
+        )
+        .outerjoin(User, Order.user_id == User.id)
+        .where(*criteria)
+    )
+
+
+def order_export_records(db: Session, rows) -> list[dict]:
+    """Export records for a chunk of orders, with their item counts in one grouped query."""
+    counts = dict(db.execute(
+        select(OrderItem.order_id, func.count(OrderItem.id))
+        .where(OrderItem.order_id.in_([row.id for row in rows]))
+        .group_by(OrderItem.order_id)
+    ).all())
+    return [
+        {field: counts.get(row.id, 0) if field == "item_count" else getattr(row, field) for field in ORDER_EXPORT_FIELDS}
+        for row in rows
+    ]
@@ -0,0 +1,77 @@
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import DateTime, and_, or_
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    payload = {
+        "s": sort,
+        "v": [v.isoformat() if isinstance(v, datetime) else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: str, columns: list) -> list:
+    """Decode an opaque cursor, checking it was issued for the same sort order."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+        if payload["s"] != sort or len(values) != len(columns):
+            raise InvalidCursorError(token)
+        return [
+            datetime.fromisoformat(v) if isinstance(col.type, DateTime) and v is not None else v
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError(token) from exc
+
+
+def keyset_after(columns: list, values: list, descending: bool):
+    """WHERE clause selecting rows strictly after `values` in `columns` order."""
+    column, *rest = columns
+    value, *rest_values = values
+    after = column < value if descending else column > value
+    if not rest:
+        return after
+    # The redundant bound on the leading column lets the index seek to the
+    # cursor; the OR alone would be walked from the start of the index.
+    bound = column <= value if descending else column >= value
+    return and_(bound, or_(after, and_(column == value, keyset_after(rest, rest_values, descending))))
+
+
+class ResultCache:
+    """Bounded TTL cache for listing aggregates (totals, facets) keyed by normalized filters."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[tuple, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        value = compute()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,72 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.services.auth import decode_access_token
+from app.services.cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the authenticated user, safe to share across requests."""
+
+    id: int
+    email: str
+    full_name: str
+    is_admin: bool
+    is_active: bool
+    created_at: datetime
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_admin=bool(user.is_admin),
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+            token_version=user.token_version or 0,
+        )
+
+
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def decode_token_cached(token: str) -> dict | None:
+    """decode_access_token, memoized by token hash until the token expires."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            return None
+        token_cache.set(key, payload, payload.get("exp", 0) - time.time())
+    return payload
+
+
+def load_principal(db: Session, user_id: int) -> Principal | None:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    return principal
+
+
+def revoke_tokens(user: User) -> None:
+    """Invalidate every token issued to `user`; call invalidate_principal after commit."""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+from typing import IO, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import ProductImportRow
+from app.services.slugs import allocate_slugs, slugify
+from app.services.stats import increment
+
+FORMATS = ("csv", "ndjson")
+IMPORT_MODES = ("upsert", "create")
+PRODUCT_EXPORT_FIELDS = ["slug", "name", "description", "price", "image_url", "stock", "is_active", "category"]
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+def detect_format(filename: str | None, requested: str | None = None) -> str:
+    fmt = (requested or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt in ("jsonl", "json"):
+        fmt = "ndjson"
+    if fmt not in FORMATS:
+        raise UnsupportedFormatError(fmt)
+    return fmt
+
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """Yield (line number, row) pairs from an uploaded file, one line at a time.
+
+    A row that cannot be parsed is yielded as an error message instead of a dict.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells mean "not provided" so schema defaults apply.
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, f"JSON invalide : {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, "Objet JSON attendu"
+            continue
+        yield line_no, row
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors())
+
+
+class ProductImporter:
+    """Write products in chunked executemany transactions.
+
+    In "upsert" mode rows are matched to existing products by slug; in
+    "create" mode every row becomes a new product and colliding slugs get a
+    numeric suffix from the batch slug allocator. Rows are buffered until a
+    chunk is full; each chunk costs a couple of slug lookups, one bulk INSERT,
+    one bulk UPDATE and one commit. A chunk that fails at the database level
+    is replayed row by row so only the offending rows are reported.
+    """
+
+    def __init__(self, db: Session, mode: str = "upsert"):
+        self.db = db
+        self.mode = mode
+        self.categories = dict(db.execute(select(Category.slug, Category.id)).all())
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self._pending: list[tuple[int, str, dict, set[str]]] = []
+
+    def add(self, line: int, raw: dict | str) -> None:
+        if isinstance(raw, str):
+            self._fail(line, raw)
+            return
+        try:
+            row = ProductImportRow.model_validate(raw)
+        except ValidationError as exc:
+            self._fail(line, _format_validation_error(exc))
+            return
+
+        fields = row.model_dump(exclude={"slug", "category"})
+        provided = row.model_fields_set - {"slug", "category"}
+        if row.category is not None:
+            if row.category not in self.categories:
+                self._fail(line, f"Catégorie inconnue : {row.category}")
+                return
+            fields["category_id"] = self.categories[row.category]
+            provided.add("category_id")
+
+        slug = row.slug or slugify(row.name)
+        if not slug:
+            self._fail(line, "Slug vide")
+            return
+
+        self._pending.append((line, slug, fields, provided))
+        if len(self._pending) >= settings.PRODUCT_IMPORT_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        chunk, self._pending = self._pending, []
+        if not chunk:
+            return
+        try:
+            created, updated = self._write(chunk)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            for entry in chunk:
+                try:
+                    row_created, row_updated = self._write([entry])
+                    self.db.commit()
+                except SQLAlchemyError as exc:
+                    self.db.rollback()
+                    self._fail(entry[0], str(getattr(exc, "orig", None) or exc))
+                else:
+                    self.created += row_created
+                    self.updated += row_updated
+            return
+        self.created += created
+        self.updated += updated
+
+    def report(self) -> dict:
+        return {"created": self.created, "updated": self.updated, "failed": self.failed, "errors": self.errors}
+
+    def _write(self, chunk: list[tuple[int, str, dict, set[str]]]) -> tuple[int, int]:
+        if self.mode == "create":
+            slugs = allocate_slugs(self.db, Product.slug, [slug for _, slug, _, _ in chunk])
+            inserts = [{"slug": slug, **fields} for slug, (_, _, fields, _) in zip(slugs, chunk)]
+            self.db.execute(insert(Product), inserts)
+            increment(self.db, products=len(inserts))
+            return len(inserts), 0
+
+        # Later rows for the same slug win.
+        rows = {slug: (fields, provided) for _, slug, fields, provided in chunk}
+        existing = dict(self.db.execute(select(Product.slug, Product.id).where(Product.slug.in_(rows))).all())
+        inserts = []
+        updates = []
+        for slug, (fields, provided) in rows.items():
+            if slug in existing:
+                updates.append({"id": existing[slug], **{key: fields[key] for key in provided}})
+            else:
+                inserts.append({"slug": slug, **fields})
+        if inserts:
+            self.db.execute(insert(Product), inserts)
+            increment(self.db, products=len(inserts))
+        if updates:
+            self.db.execute(update(Product), updates)
+        return len(inserts), len(updates)
+
+    def _fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.PRODUCT_IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+
+def product_export_query():
+    """The catalog as exported, for stream_export keyed on Product.id."""
+    return select(
+        Product.id,
+        Product.slug,
+        Product.name,
+        Product.description,
+        Product.price,
+        Product.image_url,
+        Product.stock,
+        Product.is_active,
+        Category.slug.label("category"),
+    ).outerjoin(Category, Product.category_id == Category.id)
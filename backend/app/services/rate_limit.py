@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from app.config import settings
+
+# (key, max hits, window in seconds)
+Rule = tuple[str, int, float]
+
+
+class RateLimitStore(Protocol):
+    """Storage for sliding-window counters.
+
+    The in-process store below is the default; a store shared by several
+    workers (e.g. one backed by Redis) only has to implement `hit` atomically.
+    """
+
+    def hit(self, rules: list[Rule]) -> float:
+        """Record one hit against every rule, unless one is exhausted.
+
+        Returns 0 when the hit was recorded, otherwise the number of seconds
+        to wait before retrying (and nothing is recorded).
+        """
+        ...
+
+
+class MemoryRateLimitStore:
+    """Sliding-window counters in a bounded LRU dict.
+
+    Each key keeps only the counts of the current and previous fixed windows;
+    the sliding count is the current count plus the previous one weighted by
+    how much of it still overlaps the sliding window. Memory is O(max_keys).
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [window index, count in that window, count in the previous window]
+        self._counters: OrderedDict[str, list[int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, rules: list[Rule]) -> float:
+        now = time.time()
+        with self._lock:
+            retry_after = 0.0
+            states = []
+            for key, limit, window in rules:
+                index = int(now // window)
+                counter = self._roll(key, index)
+                elapsed = now - index * window
+                weight = 1 - elapsed / window
+                if counter[1] + counter[2] * weight >= limit:
+                    # Wait for the rest of this window, which retires the previous one.
+                    retry_after = max(retry_after, window - elapsed)
+                states.append(counter)
+            if retry_after:
+                return retry_after
+            for counter in states:
+                counter[1] += 1
+            return 0.0
+
+    def _roll(self, key: str, index: int) -> list[int]:
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [index, 0, 0]
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != index:
+                previous = counter[1] if counter[0] == index - 1 else 0
+                counter[:] = [index, 0, previous]
+        return counter
+
+
+class LoginThrottle:
+    """Caps login attempts per email and per client IP before any bcrypt work."""
+
+    def __init__(self, store: RateLimitStore, per_email: int, per_ip: int, window_seconds: float):
+        self.store = store
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.window_seconds = window_seconds
+        self.allowed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def check(self, email: str, client_ip: str | None) -> int:
+        """Count one attempt; return 0 if allowed, else the Retry-After in seconds."""
+        rules = [(f"login:email:{email.strip().lower()}", self.per_email, self.window_seconds)]
+        if client_ip:
+            rules.append((f"login:ip:{client_ip}", self.per_ip, self.window_seconds))
+        retry_after = self.store.hit(rules)
+        with self._lock:
+            if retry_after:
+                self.rejected += 1
+            else:
+                self.allowed += 1
+        return max(1, math.ceil(retry_after)) if retry_after else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+login_throttle = LoginThrottle(
+    MemoryRateLimitStore(settings.LOGIN_THROTTLE_MAX_KEYS),
+    settings.LOGIN_MAX_ATTEMPTS_PER_EMAIL,
+    settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+    settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+)
@@ -0,0 +1,165 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product import Product
+from app.models.reservation import StockReservation
+from app.services.background import PeriodicTask
+
+# Holds are plain rows in stock_reservations; products.reserved is the running
+# sum of the active ones, so available-to-sell (stock - reserved) is read off
+# the product row instead of being aggregated per request. Every change to a
+# hold updates both in the same transaction.
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, product_id: int):
+        super().__init__(product_id)
+        self.product_id = product_id
+
+
+def _reserved_without(quantity: int):
+    # Never below 0, even if a hold and the counter have drifted apart.
+    return case((Product.reserved - quantity > 0, Product.reserved - quantity), else_=0)
+
+
+def _adjust_reserved(db: Session, product_id: int, delta: int) -> None:
+    query = update(Product).where(Product.id == product_id)
+    if delta > 0:
+        query = query.where(Product.stock - Product.reserved >= delta)
+        reserved = Product.reserved + delta
+    else:
+        reserved = _reserved_without(-delta)
+    result = db.execute(
+        query.values(reserved=reserved).execution_options(synchronize_session=False)
+    )
+    if delta > 0 and result.rowcount != 1:
+        raise InsufficientStockError(product_id)
+
+
+def hold_stock(db: Session, user_id: int, quantities: dict[int, int]) -> None:
+    """Set the user's holds on these products to the given quantities (0 releases).
+
+    Increases only succeed if that much stock is still available; otherwise
+    InsufficientStockError is raised and the caller must roll back. Touched
+    holds get a fresh expiry. Products are locked in id order.
+    """
+    if not quantities:
+        return
+    if any(quantity < 0 for quantity in quantities.values()):
+        raise ValueError("Hold quantities must be >= 0")
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.STOCK_HOLD_TTL_SECONDS)
+    # Writing first (rather than SELECTing) takes the lock before the current
+    # holds are read, so a concurrent sweep cannot release them in between.
+    held = dict(db.execute(
+        update(StockReservation)
+        .where(StockReservation.user_id == user_id, StockReservation.product_id.in_(quantities))
+        .values(expires_at=expires_at)
+        .returning(StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all())
+
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        delta = quantity - held.get(product_id, 0)
+        if delta:
+            _adjust_reserved(db, product_id, delta)
+        if product_id not in held:
+            if quantity > 0:
+                db.execute(insert(StockReservation).values(
+                    user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at,
+                ))
+        elif quantity > 0:
+            db.execute(
+                update(StockReservation)
+                .where(StockReservation.user_id == user_id, StockReservation.product_id == product_id)
+                .values(quantity=quantity)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            db.execute(delete(StockReservation).where(
+                StockReservation.user_id == user_id, StockReservation.product_id == product_id,
+            ))
+
+
+def release_holds(db: Session, user_id: int) -> None:
+    """Drop every hold the user has."""
+    held = db.execute(
+        delete(StockReservation)
+        .where(StockReservation.user_id == user_id)
+        .returning(StockReservation.product_id, StockReservation.quantity)
+    ).all()
+    for product_id, quantity in sorted(held):
+        _adjust_reserved(db, product_id, -quantity)
+
+
+def convert_holds(db: Session, user_id: int, quantities: dict[int, int]) -> None:
+    """Turn the user's holds into stock decrements at checkout.
+
+    Each line is taken from its own hold first and from available stock for
+    the rest (for instance when the hold expired). Raises
+    InsufficientStockError if a line cannot be covered; the caller rolls back.
+    """
+    held = dict(db.execute(
+        delete(StockReservation)
+        .where(StockReservation.user_id == user_id)
+        .returning(StockReservation.product_id, StockReservation.quantity)
+    ).all())
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        reserved = _reserved_without(held.pop(product_id, 0))
+        result = db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock - reserved >= quantity)
+            .values(stock=Product.stock - quantity, reserved=reserved)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise InsufficientStockError(product_id)
+    # Holds on products that are no longer in the cart.
+    for product_id, quantity in sorted(held.items()):
+        _adjust_reserved(db, product_id, -quantity)
+
+
+def release_expired_holds() -> int:
+    """Release expired holds in batches of STOCK_HOLD_SWEEP_BATCH_SIZE, one transaction each."""
+    released = 0
+    db = SessionLocal()
+    try:
+        while True:
+            now = datetime.now(timezone.utc)
+            ids = db.scalars(
+                select(StockReservation.id)
+                .where(StockReservation.expires_at <= now)
+                .order_by(StockReservation.expires_at)
+                .limit(settings.STOCK_HOLD_SWEEP_BATCH_SIZE)
+            ).all()
+            if not ids:
+                return released
+            # Re-check the expiry: a hold renewed since the SELECT is kept.
+            rows = db.execute(
+                delete(StockReservation)
+                .where(StockReservation.id.in_(ids), StockReservation.expires_at <= now)
+                .returning(StockReservation.product_id, StockReservation.quantity)
+            ).all()
+            totals: dict[int, int] = defaultdict(int)
+            for product_id, quantity in rows:
+                totals[product_id] += quantity
+            for product_id in sorted(totals):
+                _adjust_reserved(db, product_id, -totals[product_id])
+            db.commit()
+            released += len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+reservation_sweeper = PeriodicTask(
+    "reservation-sweeper", settings.STOCK_HOLD_SWEEP_INTERVAL_SECONDS, release_expired_holds
+)
@@ -0,0 +1,42 @@
+import re
+
+from sqlalchemy import literal_column, or_, select, text
+
+from app.models.product import Product
+
+# FTS5 index over product name, description and category name, created and
+# kept in sync by triggers (migration 0014). SQLite only.
+FTS_TABLE = "products_fts"
+
+# bm25 column weights for (name, description, category_name): a hit in the
+# product name matters far more than one buried in the description.
+_BM25 = f"bm25({FTS_TABLE}, 10.0, 1.0, 4.0)"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(search: str) -> str | None:
+    """Turn free text into an FTS5 query: every term must match, as a prefix."""
+    terms = _TOKEN_RE.findall(search)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_hits(match: str):
+    """Subquery of (product_id, rank) for products matching `match`, best first."""
+    return (
+        select(
+            literal_column("rowid").label("product_id"),
+            literal_column(_BM25).label("rank"),
+        )
+        .select_from(text(FTS_TABLE))
+        .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=match))
+        .subquery()
+    )
+
+
+def fallback_filter(search: str):
+    """Substring filter used on databases without FTS5."""
+    pattern = f"%{search}%"
+    return or_(Product.name.ilike(pattern), Product.description.ilike(pattern))
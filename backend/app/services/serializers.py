@@ -0,0 +1,84 @@
+from operator import attrgetter
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from app.models.category import Category
+from app.models.order import Order
+from app.models.product import Product
+
+# One serializer per entity. Field lists mirror the response schemas in
+# app/schemas; the getters are built once so each object costs a single C call.
+_PRODUCT_FIELDS = (
+    "id", "name", "slug", "description", "price", "image_url", "stock", "available", "is_active", "category_id",
+)
+_CATEGORY_FIELDS = ("id", "name", "slug", "description")
+_ORDER_FIELDS = ("id", "total", "status", "shipping_address", "created_at")
+_ORDER_ITEM_FIELDS = (
+    "id", "product_id", "quantity", "price_at_time", "product_name", "product_slug", "product_image_url",
+    "category_name",
+)
+
+_product_values = attrgetter(*_PRODUCT_FIELDS)
+_category_values = attrgetter(*_CATEGORY_FIELDS)
+_order_values = attrgetter(*_ORDER_FIELDS)
+_order_item_values = attrgetter(*_ORDER_ITEM_FIELDS)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson.
+
+    Endpoints return it with an already-serialized payload, which also makes
+    FastAPI skip the response_model validation pass; the response_model stays
+    on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+def serialize_product(product: Product) -> dict:
+    data = dict(zip(_PRODUCT_FIELDS, _product_values(product)))
+    data["category_name"] = product.category.name if product.category else ""
+    data["created_at"] = product.created_at
+    return data
+
+
+def serialize_category(category: Category) -> dict:
+    return dict(zip(_CATEGORY_FIELDS, _category_values(category)))
+
+
+def serialize_order(order: Order) -> dict:
+    data = dict(zip(_ORDER_FIELDS, _order_values(order)))
+    data["items"] = [dict(zip(_ORDER_ITEM_FIELDS, _order_item_values(oi))) for oi in order.items]
+    return data
+
+
+def serialize_cart(lines: dict[int, int], products: dict[int, Product]) -> dict:
+    """Serialize a cart held as {product_id: quantity}.
+
+    Lines are identified by their product_id, which is also the `id` the
+    /items/{item_id} routes expect. Lines whose product no longer exists
+    are left out.
+    """
+    cart_items = []
+    total = 0.0
+    for product_id, quantity in lines.items():
+        product = products.get(product_id)
+        if product is None:
+            continue
+        total += product.price * quantity
+        cart_items.append({
+            "id": product_id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "product": serialize_product(product),
+        })
+    return {"items": cart_items, "total": total}
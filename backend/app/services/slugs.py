@@ -0,0 +1,92 @@
+import re
+from collections import Counter
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# How many bases share one suffix lookup query when allocating in batch.
+_LOOKUP_BATCH = 200
+_MAX_ATTEMPTS = 5
+
+
+def slugify(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s-]", "", text)
+    text = re.sub(r"[\s_]+", "-", text)
+    return re.sub(r"-+", "-", text).strip("-")
+
+
+def _highest_suffix(column, base: str):
+    """Scalar subquery: the largest N among "<base>-<N>" slugs, or NULL."""
+    suffix = func.substr(column, len(base) + 2)
+    # Every "<base>-<digits>" sorts between "<base>-0" and "<base>-:" (":"
+    # follows "9"), so this reads one range of the slug's unique index and
+    # returns a single integer, however many suffixed slugs the base has.
+    return (
+        select(func.max(cast(suffix, Integer)))
+        .where(column >= f"{base}-0", column < f"{base}-:", suffix.regexp_match("^[0-9]+$"))
+        .scalar_subquery()
+    )
+
+
+def allocate_slugs(db: Session, column, bases: list[str], current: str | None = None) -> list[str]:
+    """Pick a free slug for each base, appending -2, -3, ... past the highest suffix in use.
+
+    Costs one IN lookup plus one query per batch of colliding bases, which
+    returns only the highest suffix of each. Slugs allocated earlier in the
+    same call are treated as taken, so duplicate bases get distinct slugs.
+    `current` is the slug the row already holds (on rename), which is kept
+    if it fits the base.
+    """
+    counts = Counter(bases)
+    unique_bases = list(counts)
+    taken: set[str] = set()
+    highest: dict[str, int] = {}
+    for start in range(0, len(unique_bases), _LOOKUP_BATCH):
+        batch = unique_bases[start:start + _LOOKUP_BATCH]
+        taken.update(db.scalars(select(column).where(column.in_(batch))))
+        # A base repeated in this call needs suffixes even when it is free.
+        colliding = [base for base in batch if base in taken or counts[base] > 1]
+        if not colliding:
+            continue
+        row = db.execute(select(*(_highest_suffix(column, base) for base in colliding))).one()
+        for base, suffix in zip(colliding, row):
+            highest[base] = max(suffix or 1, 1)
+
+    slugs = []
+    for base in bases:
+        if current and (current == base or re.fullmatch(rf"{re.escape(base)}-\d+", current)):
+            slugs.append(current)
+            continue
+        slug = base
+        while slug in taken:
+            highest[base] = highest.get(base, 1) + 1
+            slug = f"{base}-{highest[base]}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(db: Session, column, base: str, current: str | None = None) -> str:
+    return allocate_slugs(db, column, [base], current)[0]
+
+
+def flush_with_unique_slug(db: Session, obj, base: str) -> None:
+    """Add `obj` with a freshly allocated slug, retrying if a concurrent writer takes it first."""
+    column = type(obj).slug
+    current = obj.slug if obj in db else None
+    for attempt in range(_MAX_ATTEMPTS):
+        slug = allocate_slug(db, column, base, current)
+        try:
+            # begin_nested() flushes pending changes first, so only the slug
+            # write is inside the savepoint that a conflict rolls back.
+            with db.begin_nested():
+                obj.slug = slug
+                db.add(obj)
+                db.flush()
+            return
+        except IntegrityError:
+            current = None
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
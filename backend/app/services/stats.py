@@ -0,0 +1,200 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.stats import ProductSalesRollup, RevenueRollup, StatCounter
+from app.models.user import User
+from app.services.background import PeriodicTask
+
+COUNTERS = ("orders", "revenue", "users", "products")
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def utc_naive(moment: datetime) -> datetime:
+    """`moment` in UTC without tzinfo, like the stored timestamps; naive values are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the UTC hour or day containing `moment`."""
+    moment = utc_naive(moment).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def increment(db: Session, **deltas: float) -> None:
+    """Add to counters inside the caller's transaction, e.g. increment(db, users=1)."""
+    for name, delta in deltas.items():
+        result = db.execute(
+            update(StatCounter)
+            .where(StatCounter.name == name)
+            .values(value=StatCounter.value + delta)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(StatCounter).values(name=name, value=delta))
+
+
+def record_order(db: Session, created_at: datetime, total: float, lines: list[dict]) -> None:
+    """Count a new order in the counters and in its hourly, daily and per-product rollups.
+
+    `lines` are the order_items rows as inserted (product_id, quantity,
+    price_at_time and the product snapshot).
+    """
+    increment(db, orders=1, revenue=total)
+    day = bucket_start(created_at, "day")
+    for line in lines:
+        amount = line["quantity"] * line["price_at_time"]
+        key = (
+            ProductSalesRollup.day == day,
+            ProductSalesRollup.product_id == line["product_id"],
+            ProductSalesRollup.category_name == line["category_name"],
+        )
+        result = db.execute(
+            update(ProductSalesRollup)
+            .where(*key)
+            .values(
+                product_name=line["product_name"],
+                units=ProductSalesRollup.units + line["quantity"],
+                revenue=ProductSalesRollup.revenue + amount,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(ProductSalesRollup).values(
+                day=day,
+                product_id=line["product_id"],
+                category_name=line["category_name"],
+                product_name=line["product_name"],
+                units=line["quantity"],
+                revenue=amount,
+            ))
+    for granularity in GRANULARITIES:
+        start = bucket_start(created_at, granularity)
+        result = db.execute(
+            update(RevenueRollup)
+            .where(RevenueRollup.granularity == granularity, RevenueRollup.bucket_start == start)
+            .values(orders=RevenueRollup.orders + 1, revenue=RevenueRollup.revenue + total)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(RevenueRollup).values(
+                granularity=granularity, bucket_start=start, orders=1, revenue=total,
+            ))
+
+
+def read_counters(db: Session) -> dict:
+    values = dict(db.execute(select(StatCounter.name, StatCounter.value)).all())
+    return {name: values.get(name, 0) for name in COUNTERS}
+
+
+def timeseries(db: Session, granularity: str, start: datetime, end: datetime) -> list[dict]:
+    """Rollup buckets from `start` (inclusive) to `end` (exclusive); empty buckets are zeros."""
+    step = GRANULARITIES[granularity]
+    first = bucket_start(start, granularity)
+    end = utc_naive(end)
+    rows = {
+        row.bucket_start: row
+        for row in db.execute(
+            select(RevenueRollup.bucket_start, RevenueRollup.orders, RevenueRollup.revenue)
+            .where(
+                RevenueRollup.granularity == granularity,
+                RevenueRollup.bucket_start >= first,
+                RevenueRollup.bucket_start < end,
+            )
+        )
+    }
+    buckets = []
+    moment = first
+    while moment < end:
+        row = rows.get(moment)
+        buckets.append({
+            "bucket_start": moment,
+            "orders": row.orders if row else 0,
+            "revenue": row.revenue if row else 0.0,
+        })
+        moment += step
+    return buckets
+
+
+def reconcile_stats() -> None:
+    """Recompute the counters and the recent rollups from the source tables.
+
+    Repairs drift left by writers that bypassed the hooks (manual SQL, bulk
+    tools, a crash between two transactions). Counters are recomputed in
+    full; rollups only for the last STATS_RECONCILE_DAYS days, which bounds
+    the scan on orders.
+    """
+    db = SessionLocal()
+    try:
+        # The DELETE comes first so the write lock is held before anything is
+        # counted: pysqlite only opens the transaction at the first DML, and
+        # an order committed between a COUNT and the DELETE would be lost.
+        db.execute(delete(StatCounter))
+        totals = {
+            "orders": db.scalar(select(func.count(Order.id))),
+            "revenue": db.scalar(select(func.coalesce(func.sum(Order.total), 0))),
+            "users": db.scalar(select(func.count(User.id))),
+            "products": db.scalar(select(func.count(Product.id))),
+        }
+        db.execute(insert(StatCounter), [{"name": name, "value": value} for name, value in totals.items()])
+
+        since = bucket_start(datetime.now(timezone.utc) - timedelta(days=settings.STATS_RECONCILE_DAYS), "day")
+        buckets: dict[tuple[str, datetime], list] = defaultdict(lambda: [0, 0.0])
+        for created_at, total in db.execute(
+            select(Order.created_at, Order.total).where(Order.created_at >= since)
+        ):
+            for granularity in GRANULARITIES:
+                bucket = buckets[granularity, bucket_start(created_at, granularity)]
+                bucket[0] += 1
+                bucket[1] += total
+        db.execute(delete(RevenueRollup).where(RevenueRollup.bucket_start >= since))
+        if buckets:
+            db.execute(insert(RevenueRollup), [
+                {"granularity": granularity, "bucket_start": start, "orders": orders, "revenue": revenue}
+                for (granularity, start), (orders, revenue) in buckets.items()
+            ])
+
+        sales: dict[tuple[datetime, int, str], dict] = {}
+        for created_at, product_id, category_name, product_name, quantity, price in db.execute(
+            select(
+                Order.created_at,
+                OrderItem.product_id,
+                OrderItem.category_name,
+                OrderItem.product_name,
+                OrderItem.quantity,
+                OrderItem.price_at_time,
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.created_at >= since)
+        ):
+            row = sales.setdefault(
+                (bucket_start(created_at, "day"), product_id, category_name),
+                {"product_name": product_name, "units": 0, "revenue": 0.0},
+            )
+            row["units"] += quantity
+            row["revenue"] += quantity * price
+        db.execute(delete(ProductSalesRollup).where(ProductSalesRollup.day >= since))
+        if sales:
+            db.execute(insert(ProductSalesRollup), [
+                {"day": day, "product_id": product_id, "category_name": category_name, **row}
+                for (day, product_id, category_name), row in sales.items()
+            ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+stats_reconciler = PeriodicTask(
+    "stats-reconciler", settings.STATS_RECONCILE_INTERVAL_SECONDS, reconcile_stats, run_on_stop=False
+)
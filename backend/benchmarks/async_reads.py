@@ -0,0 +1,139 @@
+"""Requests/sec and latency of the async read routes against sync equivalents.
+
+Each of the four routes ported to `async def` (list_products, get_product,
+get_cart, list_orders) is compared with a `def` twin mounted under /bench
+that runs the same queries on the sync read session, the way the routes
+did before the port. Requests go through the full ASGI stack in process
+(httpx.ASGITransport), CONCURRENCY at a time; the sync twins therefore
+run on Starlette's threadpool exactly as they would under uvicorn. The
+catalog response cache is disabled so every request reaches the database.
+
+    cd backend && python -m benchmarks.async_reads
+"""
+import asyncio
+import time
+
+import benchmarks.common as common
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import SessionLocal
+from app.dependencies import get_current_user, get_db
+from app.main import app
+from app.models.order import Order
+from app.models.product import Product
+from app.routers.cart import _build_cart_response
+from app.routers.products import _query_products
+from app.services.auth import create_access_token
+from app.services.cache import cached_response, catalog_cache, newest_update
+from app.services.cart_store import get_cart_lines
+from app.services.orders import list_order_summaries
+from app.services.principals import Principal
+from app.services.serializers import FastJSONResponse, serialize_product
+
+CONCURRENCY = 500
+REQUESTS = 5000
+ORDERS = 200
+
+bench = APIRouter()
+
+
+@bench.get("/products/")
+def list_products_sync(request: Request, db: Session = Depends(get_db)):
+    key = ("bench-products",)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        payload, last_modified = _query_products(db, 1, 12, "newest", None, None, None, None, None, False)
+        body = catalog_cache.store(key, payload, last_modified, ["products"], generation)
+    return cached_response(request, body)
+
+
+@bench.get("/products/{slug}")
+def get_product_sync(slug: str, request: Request, db: Session = Depends(get_db)):
+    key = ("bench-product", slug)
+    body, generation = catalog_cache.lookup(key)
+    if body is None:
+        product = db.scalar(
+            select(Product)
+            .options(joinedload(Product.category))
+            .where(Product.slug == slug, Product.is_active == True)
+        )
+        if not product:
+            raise HTTPException(status_code=404, detail="Produit non trouvé")
+        body = catalog_cache.store(key, serialize_product(product), newest_update([product]), [f"product:{slug}"], generation)
+    return cached_response(request, body)
+
+
+@bench.get("/cart/")
+def get_cart_sync(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    return _build_cart_response(db, get_cart_lines(db, current_user.id))
+
+
+@bench.get("/orders/")
+def list_orders_sync(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    return FastJSONResponse(list_order_summaries(db, 20, None, Order.user_id == current_user.id))
+
+
+app.include_router(bench, prefix="/bench")
+
+ROUTES = [
+    ("list_products", "/api/products/"),
+    ("get_product", "/api/products/casque-bluetooth"),
+    ("get_cart", "/api/cart/"),
+    ("list_orders", "/api/orders/"),
+]
+
+
+def _prepare() -> dict:
+    db = SessionLocal()
+    try:
+        db.execute(
+            Order.__table__.insert(),
+            [{"user_id": 2, "total": 10.0, "status": "pending", "shipping_address": "adresse"}] * ORDERS,
+        )
+        db.commit()
+    finally:
+        db.close()
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "2", "ver": 0})}
+    # Every request misses the response cache and runs its queries.
+    catalog_cache.max_entries = 0
+    return headers
+
+
+async def _run(client: httpx.AsyncClient, path: str, headers: dict, total: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - started, latencies
+
+
+async def main() -> None:
+    headers = _prepare()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for product_id in (1, 5, 8):
+            response = await client.post("/api/cart/items", json={"product_id": product_id}, headers=headers)
+            assert response.status_code == 200, response.text
+        print(f"{REQUESTS} requests per route, {CONCURRENCY} concurrent")
+        for name, path in ROUTES:
+            for label, url in ((f"{name} (sync)", "/bench" + path.removeprefix("/api")), (f"{name} (async)", path)):
+                await _run(client, url, headers, CONCURRENCY)  # warm up pools and caches
+                common.report(label, *await _run(client, url, headers, REQUESTS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+"""Shared setup for the benchmark scripts.
+
+Settings are read at import time, so this module must be imported before
+anything from app: it points the app at a throwaway database (seeded on
+import) and makes password hashing cheap, as tests/conftest.py does.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="onlineshop-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'shop.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_USE_PROCESSES"] = "false"
+
+from app.seed import seed  # noqa: E402
+
+seed()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label: str, seconds: float, latencies: list[float]) -> None:
+    print(
+        f"{label:<28} {len(latencies) / seconds:8.0f} req/s"
+        f"   p50 {percentile(latencies, 0.5) * 1000:7.1f} ms"
+        f"   p99 {percentile(latencies, 0.99) * 1000:7.1f} ms"
+    )
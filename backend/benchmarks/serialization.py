@@ -0,0 +1,137 @@
+"""Cost of turning large listings into response bytes, old path against new.
+
+The old path is what the routes did before app/services/serializers.py: a
+dict built field by field, validated against the route's response_model
+and dumped in JSON mode (FastAPI's serialize_response), then encoded with
+json.dumps the way Starlette's JSONResponse does. The new path is the
+attrgetter serializers plus orjson. Both start from the same loaded ORM
+objects, so the queries are not timed, and both must produce the same JSON.
+
+    cd backend && python -m benchmarks.serialization
+"""
+import json
+import time
+
+import benchmarks.common as common  # noqa: F401  (sets up the database)
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.database import SessionLocal
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.schemas.order import OrderResponse
+from app.schemas.product import ProductResponse
+from app.services.serializers import dump_json, serialize_order, serialize_product
+
+PRODUCTS = 100
+ORDERS = 100
+ITEMS_PER_ORDER = 12
+ROUNDS = 50
+
+
+def _old_product(product: Product) -> dict:
+    return {
+        "id": product.id,
+        "name": product.name,
+        "slug": product.slug,
+        "description": product.description,
+        "price": product.price,
+        "image_url": product.image_url,
+        "stock": product.stock,
+        "available": product.available,
+        "is_active": product.is_active,
+        "category_id": product.category_id,
+        "category_name": product.category.name if product.category else "",
+        "created_at": product.created_at,
+    }
+
+
+def _old_order(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "total": order.total,
+        "status": order.status,
+        "shipping_address": order.shipping_address,
+        "created_at": order.created_at,
+        "items": [
+            {
+                "id": oi.id,
+                "product_id": oi.product_id,
+                "quantity": oi.quantity,
+                "price_at_time": oi.price_at_time,
+                "product_name": oi.product_name,
+                "product_slug": oi.product_slug,
+                "product_image_url": oi.product_image_url,
+                "category_name": oi.category_name,
+            }
+            for oi in order.items
+        ],
+    }
+
+
+def _old_path(adapter: TypeAdapter, build, objects) -> bytes:
+    content = adapter.dump_python(adapter.validate_python([build(o) for o in objects]), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def _new_path(serialize, objects) -> bytes:
+    return dump_json([serialize(o) for o in objects])
+
+
+def _prepare(db) -> tuple[list[Product], list[Order]]:
+    db.execute(insert(Product), [
+        {"name": f"Produit {i}", "slug": f"bench-produit-{i}", "description": "Description du produit " * 4,
+         "price": 9.99 + i, "stock": i % 7, "category_id": 1 + i % 3}
+        for i in range(PRODUCTS)
+    ])
+    product_ids = db.scalars(select(Product.id).limit(ITEMS_PER_ORDER)).all()
+    order_ids = [
+        db.execute(insert(Order).values(user_id=2, total=120.0, shipping_address="1 rue de la Paix")).inserted_primary_key[0]
+        for _ in range(ORDERS)
+    ]
+    db.execute(insert(OrderItem), [
+        {"order_id": order_id, "product_id": product_id, "quantity": 1, "price_at_time": 10.0,
+         "product_name": "Produit", "product_slug": "produit", "product_image_url": "", "category_name": "Catégorie"}
+        for order_id in order_ids
+        for product_id in product_ids
+    ])
+    db.commit()
+    products = db.scalars(
+        select(Product).options(joinedload(Product.category)).where(Product.slug.like("bench-produit-%"))
+    ).all()
+    orders = db.scalars(select(Order).options(selectinload(Order.items)).where(Order.id.in_(order_ids))).all()
+    return products, orders
+
+
+def _best(fn) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        products, orders = _prepare(db)
+        cases = [
+            (f"{PRODUCTS} products", TypeAdapter(list[ProductResponse]), _old_product, serialize_product, products),
+            (f"{ORDERS} orders x {ITEMS_PER_ORDER} items", TypeAdapter(list[OrderResponse]), _old_order,
+             serialize_order, orders),
+        ]
+        print(f"best of {ROUNDS} rounds")
+        for label, adapter, old, new, objects in cases:
+            assert json.loads(_old_path(adapter, old, objects)) == json.loads(_new_path(new, objects))
+            before = _best(lambda: _old_path(adapter, old, objects))
+            after = _best(lambda: _new_path(new, objects))
+            print(f"{label:<24} old {before * 1000:7.2f} ms   new {after * 1000:7.2f} ms   x{before / after:4.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the test database and fast hashing
+# must be configured before anything from app is imported.
+_db_dir = tempfile.mkdtemp(prefix="onlineshop-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'shop.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_USE_PROCESSES"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.seed import seed
+
+seed()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    def _login(email: str, password: str) -> dict:
+        response = client.post("/api/auth/login", data={"username": email, "password": password})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return _login
+
+
+@pytest.fixture(scope="session")
+def admin_headers(login):
+    return login("admin@onlineshop.com", "admin123")
+
+
+@pytest.fixture(scope="session")
+def user_headers(login):
+    return login("user@onlineshop.com", "user123")
@@ -0,0 +1,107 @@
+from itertools import count
+
+import pytest
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.reservation import StockReservation
+from app.models.user import User
+from app.services.auth import create_access_token
+
+_numbers = count()
+
+
+@pytest.fixture
+def shopper():
+    db = SessionLocal()
+    try:
+        user = User(email=f"lot{next(_numbers)}@example.com", full_name="Lot", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user.id, {"Authorization": "Bearer " + create_access_token({"sub": str(user.id), "ver": 0})}
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def shelf(client, admin_headers):
+    ids = []
+    for name, price in (("Tasse lot", 4.0), ("Assiette lot", 6.5), ("Bol lot", 3.0)):
+        response = client.post(
+            "/api/admin/products", json={"name": name, "price": price, "stock": 5}, headers=admin_headers
+        )
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def _holds(user_id: int) -> dict[int, int]:
+    db = SessionLocal()
+    try:
+        return dict(db.execute(
+            select(StockReservation.product_id, StockReservation.quantity).where(StockReservation.user_id == user_id)
+        ).all())
+    finally:
+        db.close()
+
+
+def _batch(client, headers, *operations: dict, **params):
+    return client.post("/api/cart/batch", params=params, json={"operations": list(operations)}, headers=headers)
+
+
+def _lines(response) -> dict[int, int]:
+    return {item["product_id"]: item["quantity"] for item in response.json()["items"]}
+
+
+def test_operations_apply_in_order(client, shelf, shopper):
+    user_id, headers = shopper
+    cup, plate, bowl = shelf
+    response = _batch(
+        client,
+        headers,
+        {"op": "add", "product_id": cup, "quantity": 2},
+        {"op": "add", "product_id": plate},
+        {"op": "set", "product_id": cup, "quantity": 3},
+        {"op": "remove", "product_id": plate},
+        {"op": "add", "product_id": bowl},
+        {"op": "add", "product_id": bowl},
+    )
+    assert response.status_code == 200, response.text
+    assert _lines(response) == {cup: 3, bowl: 2}
+    assert response.json()["total"] == 3 * 4.0 + 2 * 3.0
+    assert _holds(user_id) == {cup: 3, bowl: 2}
+
+    response = _batch(client, headers, {"op": "set", "product_id": bowl, "quantity": 0}, view="summary")
+    assert response.json() == {"item_count": 1, "quantity": 3, "total": 12.0}
+    assert _holds(user_id) == {cup: 3}
+
+
+def test_batch_is_all_or_nothing(client, shelf, shopper):
+    user_id, headers = shopper
+    cup, plate, _ = shelf
+    assert _batch(client, headers, {"op": "add", "product_id": cup}).status_code == 200
+
+    too_many = _batch(
+        client, headers, {"op": "add", "product_id": plate, "quantity": 2}, {"op": "set", "product_id": cup, "quantity": 6}
+    )
+    assert too_many.status_code == 400
+    assert too_many.json()["detail"] == f"Stock insuffisant : {cup}"
+
+    unknown = _batch(client, headers, {"op": "add", "product_id": plate}, {"op": "add", "product_id": 999_999})
+    assert unknown.status_code == 404
+    assert unknown.json()["detail"] == "Produit non trouvé : 999999"
+
+    invalid = _batch(client, headers, {"op": "add", "product_id": plate, "quantity": 0})
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Quantité invalide"
+
+    assert _lines(client.get("/api/cart/", headers=headers)) == {cup: 1}
+    assert _holds(user_id) == {cup: 1}
+
+
+def test_single_add_reports_stock_like_the_batch(client, shelf, shopper):
+    _, headers = shopper
+    _, _, bowl = shelf
+    response = client.post("/api/cart/items", json={"product_id": bowl, "quantity": 6}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Stock insuffisant : {bowl}"
@@ -0,0 +1,75 @@
+from itertools import count
+
+import pytest
+from sqlalchemy import select
+
+import app.services.cart_store as cart_store_module
+from app.database import SessionLocal
+from app.models.cart import CartItem
+from app.models.user import User
+from app.services.cart_store import MemoryCartStore, flush_dirty_carts
+
+
+_numbers = count()
+
+
+@pytest.fixture
+def shoppers():
+    db = SessionLocal()
+    try:
+        users = [User(email=f"panier{next(_numbers)}@example.com", full_name="Panier", hashed_password="x") for _ in range(2)]
+        db.add_all(users)
+        db.commit()
+        return [user.id for user in users]
+    finally:
+        db.close()
+
+
+def _stored_lines(user_id: int) -> dict[int, int]:
+    db = SessionLocal()
+    try:
+        return dict(db.execute(
+            select(CartItem.product_id, CartItem.quantity).where(CartItem.user_id == user_id)
+        ).all())
+    finally:
+        db.close()
+
+
+def test_flush_survives_eviction_while_writing(monkeypatch, shoppers):
+    store = MemoryCartStore(max_entries=2)
+    first, second = shoppers
+    store.put(first, {1: 2})
+    store.put(second, {3: 1})
+    write = cart_store_module.write_cart_lines
+
+    def write_while_evicting(db, user_id, lines):
+        # Other users' carts are loaded mid-flush, pushing the store over its
+        # limit while the flushed carts are already marked clean.
+        for other in range(100_000, 100_003):
+            store.put(other, {}, dirty=False)
+        write(db, user_id, lines)
+
+    monkeypatch.setattr(cart_store_module, "write_cart_lines", write_while_evicting)
+    assert flush_dirty_carts(store) == 2
+
+    assert _stored_lines(first) == {1: 2}
+    assert _stored_lines(second) == {3: 1}
+    assert store.pop_dirty() == {}
+
+
+def test_failed_flush_keeps_latest_lines_dirty(monkeypatch, shoppers):
+    store = MemoryCartStore(max_entries=10)
+    first, second = shoppers
+    store.put(first, {1: 1})
+    store.put(second, {2: 1})
+
+    def failing_write(db, user_id, lines):
+        store.put(first, {1: 5})  # changed while the flush runs
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(cart_store_module, "write_cart_lines", failing_write)
+    with pytest.raises(RuntimeError):
+        flush_dirty_carts(store)
+
+    assert store.pop_dirty() == {first: {1: 5}, second: {2: 1}}
+    assert _stored_lines(first) == {}
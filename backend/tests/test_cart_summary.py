@@ -0,0 +1,72 @@
+from itertools import count
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.auth import create_access_token
+
+_numbers = count()
+
+
+@pytest.fixture
+def shopper():
+    db = SessionLocal()
+    try:
+        user = User(email=f"resume{next(_numbers)}@example.com", full_name="Résumé", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return {"Authorization": "Bearer " + create_access_token({"sub": str(user.id), "ver": 0})}
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def two_products(client, admin_headers):
+    ids = []
+    for name, price in (("Carnet résumé", 2.5), ("Stylo résumé", 1.25)):
+        response = client.post(
+            "/api/admin/products", json={"name": name, "price": price, "stock": 10}, headers=admin_headers
+        )
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_summary_matches_the_full_cart(client, shopper, two_products):
+    notebook, pen = two_products
+    client.post("/api/cart/items", json={"product_id": notebook, "quantity": 2}, headers=shopper)
+    full = client.post("/api/cart/items", json={"product_id": pen, "quantity": 3}, headers=shopper).json()
+
+    summary = client.get("/api/cart/summary", headers=shopper).json()
+    assert summary == {"item_count": 2, "quantity": 5, "total": full["total"]}
+    assert summary["total"] == 2 * 2.5 + 3 * 1.25
+
+
+def test_mutations_answer_with_the_summary_view(client, shopper, two_products):
+    notebook, pen = two_products
+    response = client.post(
+        "/api/cart/items", params={"view": "summary"}, json={"product_id": notebook}, headers=shopper
+    )
+    assert response.json() == {"item_count": 1, "quantity": 1, "total": 2.5}
+
+    client.post("/api/cart/items", json={"product_id": pen}, headers=shopper)
+    response = client.patch(f"/api/cart/items/{pen}", params={"view": "summary"}, json={"quantity": 4}, headers=shopper)
+    assert response.json() == {"item_count": 2, "quantity": 5, "total": 7.5}
+
+    response = client.delete(f"/api/cart/items/{notebook}", params={"view": "summary"}, headers=shopper)
+    assert response.json() == {"item_count": 1, "quantity": 4, "total": 5.0}
+
+    response = client.delete(f"/api/cart/items/{pen}", params={"view": "bref"}, headers=shopper)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Vue invalide"
+
+
+def test_deleted_products_are_left_out(client, admin_headers, shopper, two_products):
+    notebook, pen = two_products
+    client.post("/api/cart/items", json={"product_id": notebook}, headers=shopper)
+    client.post("/api/cart/items", json={"product_id": pen, "quantity": 2}, headers=shopper)
+    assert client.delete(f"/api/admin/products/{notebook}", headers=admin_headers).status_code == 200
+
+    assert client.get("/api/cart/summary", headers=shopper).json() == {"item_count": 1, "quantity": 2, "total": 2.5}
+    assert [item["product_id"] for item in client.get("/api/cart/", headers=shopper).json()["items"]] == [pen]
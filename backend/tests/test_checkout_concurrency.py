@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.product import Product
+from app.models.reservation import StockReservation
+from app.models.user import User
+from app.services.auth import create_access_token
+from app.services.reservations import release_expired_holds
+
+STOCK = 100
+BUYERS = 300
+# One thread per buyer, so every checkout is in flight at once.
+THREADS = BUYERS
+
+
+def test_parallel_checkouts_never_oversell(client, admin_headers, record_property):
+    product = client.post(
+        "/api/admin/products",
+        json={"name": "Article très demandé", "price": 10, "stock": BUYERS},
+        headers=admin_headers,
+    ).json()
+
+    db = SessionLocal()
+    try:
+        users = [User(email=f"acheteur{i}@example.com", full_name="Acheteur", hashed_password="x") for i in range(BUYERS)]
+        db.add_all(users)
+        db.commit()
+        headers = [
+            {"Authorization": "Bearer " + create_access_token({"sub": str(user.id), "ver": 0})} for user in users
+        ]
+    finally:
+        db.close()
+
+    for buyer in headers:
+        response = client.post("/api/cart/items", json={"product_id": product["id"], "quantity": 1}, headers=buyer)
+        assert response.status_code == 200, response.text
+
+    # Expire every hold, then cut the stock: the checkouts now compete for
+    # STOCK units with nothing reserved, which is the path where an unguarded
+    # read-modify-write would oversell.
+    db = SessionLocal()
+    try:
+        db.execute(update(StockReservation).values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        db.commit()
+        release_expired_holds()
+        db.execute(update(Product).where(Product.id == product["id"]).values(stock=STOCK))
+        db.commit()
+    finally:
+        db.close()
+
+    def checkout(buyer: dict) -> int:
+        return client.post("/api/orders/", json={"shipping_address": "1 rue de la Paix"}, headers=buyer).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as executor:
+        statuses = list(executor.map(checkout, headers))
+    # Reported in the JUnit XML (pytest --junitxml); see benchmarks/README.md
+    # for the figures against the read-modify-write checkout.
+    record_property("checkouts_per_second", round(BUYERS / (time.perf_counter() - started)))
+
+    assert set(statuses) <= {201, 400}
+    assert statuses.count(201) == STOCK
+
+    db = SessionLocal()
+    try:
+        stock, reserved = db.query(Product.stock, Product.reserved).filter(Product.id == product["id"]).one()
+    finally:
+        db.close()
+    assert stock == 0
+    assert reserved == 0
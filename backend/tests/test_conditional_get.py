@@ -0,0 +1,92 @@
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.models.category import Category
+from app.models.product import Product
+from app.services.cache import catalog_cache
+
+LONG_AGO = datetime(2020, 1, 1, 12, 0, 0)
+LONG_AGO_HTTP = "Wed, 01 Jan 2020 12:00:00 GMT"
+
+
+@pytest.fixture
+def lamp(client, admin_headers):
+    """A fresh product whose row and category were last touched LONG_AGO."""
+    response = client.post(
+        "/api/admin/products",
+        json={"name": "Lampe conditionnelle", "price": 12.5, "stock": 4, "category_id": 1},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201, response.text
+    product = response.json()
+    db = SessionLocal()
+    try:
+        db.execute(update(Product).where(Product.id == product["id"]).values(updated_at=LONG_AGO))
+        db.execute(update(Category).where(Category.id == 1).values(updated_at=LONG_AGO))
+        db.commit()
+    finally:
+        db.close()
+    catalog_cache.clear()
+    yield product
+    client.delete(f"/api/admin/products/{product['id']}", headers=admin_headers)
+
+
+def test_last_modified_comes_from_the_row(client, lamp):
+    response = client.get(f"/api/products/{lamp['slug']}")
+    assert response.headers["last-modified"] == LONG_AGO_HTTP
+
+    # Served from the cache: the timestamp is the row's, not the fill time.
+    cached = client.get(f"/api/products/{lamp['slug']}", headers={"If-Modified-Since": LONG_AGO_HTTP})
+    assert cached.status_code == 304
+    assert cached.headers["last-modified"] == LONG_AGO_HTTP
+
+
+def test_an_update_moves_last_modified(client, admin_headers, lamp):
+    response = client.put(f"/api/admin/products/{lamp['id']}", json={"price": 13.0}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.get(f"/api/products/{lamp['slug']}", headers={"If-Modified-Since": LONG_AGO_HTTP})
+    assert response.status_code == 200
+    assert parsedate_to_datetime(response.headers["last-modified"]) > parsedate_to_datetime(LONG_AGO_HTTP)
+    assert response.json()["price"] == 13.0
+
+
+def test_listing_uses_the_newest_row(client, lamp):
+    response = client.get("/api/products/", params={"category": "electronique"})
+    assert response.status_code == 200, response.text
+    db = SessionLocal()
+    try:
+        # The first page in the default (newest) order, as the route reads it.
+        stamps = db.scalars(
+            select(Product.updated_at)
+            .where(Product.is_active == True, Product.category_id == 1)
+            .order_by(Product.created_at.desc(), Product.id.desc())
+            .limit(12)
+        ).all()
+    finally:
+        db.close()
+    expected = max([*stamps, LONG_AGO]).replace(microsecond=0)
+    assert parsedate_to_datetime(response.headers["last-modified"]).replace(tzinfo=None) == expected
+
+
+def test_empty_listing_has_no_last_modified(client):
+    response = client.get("/api/products/", params={"search": "introuvablexyz"})
+    assert response.status_code == 200
+    assert "last-modified" not in response.headers
+    assert client.get(
+        "/api/products/", params={"search": "introuvablexyz"}, headers={"If-Modified-Since": LONG_AGO_HTTP}
+    ).status_code == 200
+
+
+def test_etag_still_wins(client, lamp):
+    first = client.get(f"/api/products/{lamp['slug']}")
+    response = client.get(
+        f"/api/products/{lamp['slug']}",
+        headers={"If-None-Match": '"autre"', "If-Modified-Since": LONG_AGO_HTTP},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Several keyset pages even on the small test catalog.
+    monkeypatch.setattr(settings, "PRODUCT_EXPORT_CHUNK_SIZE", 3)
+    monkeypatch.setattr(settings, "ORDER_EXPORT_CHUNK_SIZE", 2)
+
+
+@pytest.fixture
+def exporter():
+    db = SessionLocal()
+    try:
+        user = User(email="export@example.com", full_name="Export", hashed_password="x")
+        db.add(user)
+        db.flush()
+        order_ids = [
+            db.execute(insert(Order).values(user_id=user.id, total=total, shipping_address="3 quai Ouest"))
+            .inserted_primary_key[0]
+            for total in (10.0, 20.0, 30.0, 40.0, 50.0)
+        ]
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": 1, "quantity": 1, "price_at_time": 10.0}
+            for position, order_id in enumerate(order_ids)
+            for _ in range(position)
+        ])
+        db.commit()
+        return user.id, order_ids
+    finally:
+        db.close()
+
+
+def _catalog() -> list[str]:
+    db = SessionLocal()
+    try:
+        return db.scalars(select(Product.slug).order_by(Product.id)).all()
+    finally:
+        db.close()
+
+
+def test_products_csv_spans_every_chunk(client, admin_headers, small_chunks):
+    response = client.get("/api/admin/products/export", params={"format": "csv"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["slug"] for row in rows] == _catalog()
+    assert list(rows[0]) == ["slug", "name", "description", "price", "image_url", "stock", "is_active", "category"]
+
+
+def test_products_ndjson_round_trips_through_import(client, admin_headers, small_chunks):
+    response = client.get("/api/admin/products/export", params={"format": "ndjson"}, headers=admin_headers)
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["slug"] for record in records] == _catalog()
+    assert records[0]["category"] == "electronique"
+
+    # Re-importing the export in upsert mode changes nothing but updates every row.
+    upload = {"file": ("catalogue.ndjson", response.content)}
+    report = client.post("/api/admin/products/import", files=upload, headers=admin_headers).json()
+    assert report["created"] == 0
+    assert report["updated"] == len(records)
+
+
+def test_orders_export_filters_and_counts_items(client, admin_headers, small_chunks, exporter):
+    user_id, order_ids = exporter
+    response = client.get(
+        "/api/admin/orders/export",
+        params={"format": "ndjson", "user_id": user_id, "min_total": 20},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["id"] for record in records] == order_ids[1:]
+    assert [record["item_count"] for record in records] == [1, 2, 3, 4]
+    assert {record["user_email"] for record in records} == {"export@example.com"}
+
+
+def test_orders_csv_matches_the_database(client, admin_headers, small_chunks):
+    response = client.get("/api/admin/orders/export", headers=admin_headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    db = SessionLocal()
+    try:
+        assert len(rows) == db.scalar(select(func.count(Order.id)))
+    finally:
+        db.close()
+    assert [int(row["id"]) for row in rows] == sorted(int(row["id"]) for row in rows)
+
+
+def test_unknown_format_is_rejected(client, admin_headers):
+    response = client.get("/api/admin/products/export", params={"format": "xlsx"}, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Format non supporté (csv ou ndjson)"
@@ -0,0 +1,34 @@
+import app.routers.auth as auth_router
+from app.services.rate_limit import LoginThrottle, MemoryRateLimitStore
+
+
+def _throttle(per_email: int = 3, per_ip: int = 5) -> LoginThrottle:
+    return LoginThrottle(MemoryRateLimitStore(max_keys=100), per_email, per_ip, window_seconds=60)
+
+
+def test_per_email_limit_is_case_insensitive():
+    throttle = _throttle()
+    assert [throttle.check(email, "10.0.0.1") for email in ("a@x.fr", "A@x.fr", " a@X.FR ")] == [0, 0, 0]
+    assert throttle.check("a@x.fr", "10.0.0.2") > 0
+    assert throttle.check("b@x.fr", "10.0.0.1") == 0
+    assert throttle.stats() == {"allowed": 4, "rejected": 1}
+
+
+def test_per_ip_limit_spans_emails():
+    throttle = _throttle(per_email=10, per_ip=2)
+    assert throttle.check("a@x.fr", "10.0.0.1") == 0
+    assert throttle.check("b@x.fr", "10.0.0.1") == 0
+    assert 1 <= throttle.check("c@x.fr", "10.0.0.1") <= 60
+    # A rejected attempt is not counted against its email.
+    assert throttle.check("c@x.fr", "10.0.0.2") == 0
+
+
+def test_login_is_throttled_before_checking_the_password(client, monkeypatch):
+    monkeypatch.setattr(auth_router, "login_throttle", _throttle(per_email=2))
+    form = {"username": "user@onlineshop.com", "password": "mauvais"}
+    assert [client.post("/api/auth/login", data=form).status_code for _ in range(2)] == [401, 401]
+
+    response = client.post("/api/auth/login", data={**form, "password": "user123"})
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Trop de tentatives de connexion, réessayez plus tard"
+    assert 1 <= int(response.headers["retry-after"]) <= 60
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.models.product import Product
+from app.services.pagination import encode_cursor
+
+PRODUCTS = 25
+# Few distinct values, so every sort has long runs of ties for the id to break.
+CREATED = [datetime(2026, 5, 1, 10, 0, 0), datetime(2026, 5, 2, 10, 0, 0)]
+PRICES = [5.0, 10.0, 15.0]
+NAMES = ["Bol", "Pot", "Vase"]
+
+EXPECTED_ORDER = {
+    "newest": lambda p: (-p["created_at"].timestamp(), -p["id"]),
+    "price": lambda p: (p["price"], p["id"]),
+    "price_desc": lambda p: (-p["price"], -p["id"]),
+    "name": lambda p: (p["name"], p["id"]),
+}
+
+
+@pytest.fixture(scope="module")
+def shelf(client, admin_headers):
+    response = client.post("/api/admin/categories", json={"name": "Pagination"}, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    category = response.json()
+    rows = [
+        {
+            "name": NAMES[i % len(NAMES)],
+            "slug": f"pagination-{i}",
+            "price": PRICES[i % len(PRICES)],
+            "stock": 1,
+            "category_id": category["id"],
+            "created_at": CREATED[i % len(CREATED)],
+        }
+        for i in range(PRODUCTS)
+    ]
+    db = SessionLocal()
+    try:
+        ids = db.scalars(insert(Product).returning(Product.id), rows).all()
+        db.commit()
+    finally:
+        db.close()
+    return category["slug"], [{**row, "id": id_} for row, id_ in zip(rows, ids)]
+
+
+def _page(client, slug: str, **params) -> dict:
+    response = client.get("/api/products/", params={"category": slug, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _walk(client, slug: str, sort: str, limit: int) -> list[list[int]]:
+    pages = []
+    body = _page(client, slug, sort=sort, limit=limit)
+    while True:
+        pages.append([product["id"] for product in body["products"]])
+        if body["next_cursor"] is None:
+            return pages
+        body = _page(client, slug, sort=sort, limit=limit, after=body["next_cursor"])
+
+
+@pytest.mark.parametrize("sort", sorted(EXPECTED_ORDER))
+@pytest.mark.parametrize("limit", [7, 5])
+def test_cursor_walk_visits_every_product_once_in_order(client, shelf, sort, limit):
+    slug, products = shelf
+    pages = _walk(client, slug, sort, limit)
+
+    expected = [p["id"] for p in sorted(products, key=EXPECTED_ORDER[sort])]
+    assert [product_id for page in pages for product_id in page] == expected
+    # 25 = 7+7+7+4 or 5x5: a full last page must not advertise an empty one.
+    assert [len(page) for page in pages] == ([7, 7, 7, 4] if limit == 7 else [5] * 5)
+
+
+def test_cursor_and_offset_agree_on_the_first_page(client, shelf):
+    slug, _ = shelf
+    by_cursor = _page(client, slug, sort="price", limit=7)
+    by_offset = _page(client, slug, sort="price", limit=7, page=1)
+    assert by_cursor["products"] == by_offset["products"]
+    assert by_cursor["total"] == PRODUCTS
+    assert by_cursor["pages"] == 4
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"sort": "price", "after": "pas-un-curseur"},
+        {"sort": "price", "after": encode_cursor("name", ["Bol", 1])},  # issued for another sort
+        {"sort": "price", "after": encode_cursor("price", [5.0])},  # wrong number of values
+        {"sort": "newest", "after": encode_cursor("newest", ["hier", 1])},  # not a datetime
+        {"sort": "relevance", "search": "bol", "after": encode_cursor("price", [5.0, 1])},
+    ],
+)
+def test_bad_cursors_are_rejected(client, shelf, params):
+    slug, _ = shelf
+    response = client.get("/api/products/", params={"category": slug, **params})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Curseur invalide"
+
+
+def test_unknown_sort_is_rejected(client, shelf):
+    slug, _ = shelf
+    response = client.get("/api/products/", params={"category": slug, "sort": "stock"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Tri invalide"
@@ -0,0 +1,61 @@
+from itertools import count
+
+import pytest
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.user import User
+
+_numbers = count()
+
+
+@pytest.fixture
+def member(client):
+    email = f"membre{next(_numbers)}@example.com"
+    response = client.post("/api/auth/register", json={"email": email, "password": "secret123", "full_name": "Membre"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"], email
+
+
+def test_admin_change_revokes_existing_tokens(client, login, admin_headers, member):
+    user_id, email = member
+    headers = login(email, "secret123")
+    assert client.get("/api/auth/me", headers=headers).status_code == 200  # now cached
+
+    response = client.patch(f"/api/admin/users/{user_id}", json={"is_admin": True}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token révoqué"
+
+    fresh = login(email, "secret123")
+    response = client.get("/api/auth/me", headers=fresh)
+    assert response.status_code == 200
+    assert response.json()["is_admin"] is True
+
+
+def test_deactivated_user_is_rejected_at_once(client, login, admin_headers, member):
+    user_id, email = member
+    headers = login(email, "secret123")
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    response = client.patch(f"/api/admin/users/{user_id}", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=login(email, "secret123")).status_code == 401
+
+
+def test_principal_is_served_from_the_cache(client, login, member):
+    user_id, email = member
+    headers = login(email, "secret123")
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Membre"
+
+    # A write that bypasses the admin routes is not seen until the entry expires.
+    db = SessionLocal()
+    try:
+        db.execute(update(User).where(User.id == user_id).values(full_name="Renommé"))
+        db.commit()
+    finally:
+        db.close()
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Membre"
@@ -0,0 +1,101 @@
+import json
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product import Product
+
+
+def _import(client, admin_headers, filename: str, content: str, **params) -> dict:
+    response = client.post(
+        "/api/admin/products/import",
+        params=params,
+        files={"file": (filename, content.encode("utf-8"))},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _ndjson(*rows: dict) -> str:
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def _products(*slugs: str) -> dict[str, dict]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Product.slug, Product.name, Product.description, Product.price, Product.stock)
+            .where(Product.slug.in_(slugs))
+        ).all()
+        return {row.slug: row._asdict() for row in rows}
+    finally:
+        db.close()
+
+
+def test_upsert_creates_then_updates_only_the_given_fields(client, admin_headers):
+    report = _import(
+        client,
+        admin_headers,
+        "catalogue.csv",
+        "slug,name,description,price,stock,category\r\n"
+        "import-tapis,Tapis,Laine tissée,49.9,3,maison\r\n"
+        "import-coussin,Coussin,Lin,19.5,10,\r\n",
+    )
+    assert report == {"created": 2, "updated": 0, "failed": 0, "errors": []}
+
+    # Empty cells are "not provided": the description and stock stay as they were.
+    report = _import(
+        client,
+        admin_headers,
+        "catalogue.csv",
+        "slug,name,description,price,stock\r\n"
+        "import-tapis,Tapis,,44.9,\r\n"
+        "import-plaid,Plaid,,29.0,2\r\n",
+    )
+    assert report == {"created": 1, "updated": 1, "failed": 0, "errors": []}
+    assert _products("import-tapis", "import-coussin", "import-plaid") == {
+        "import-tapis": {"slug": "import-tapis", "name": "Tapis", "description": "Laine tissée", "price": 44.9, "stock": 3},
+        "import-coussin": {"slug": "import-coussin", "name": "Coussin", "description": "Lin", "price": 19.5, "stock": 10},
+        "import-plaid": {"slug": "import-plaid", "name": "Plaid", "description": "", "price": 29.0, "stock": 2},
+    }
+
+
+def test_create_mode_suffixes_colliding_slugs(client, admin_headers):
+    rows = [{"name": "Bougie ambre", "price": 7.5}] * 3
+    report = _import(client, admin_headers, "bougies.ndjson", _ndjson(*rows), mode="create")
+    assert report == {"created": 3, "updated": 0, "failed": 0, "errors": []}
+    created = _products("bougie-ambre", "bougie-ambre-2", "bougie-ambre-3")
+    assert sorted(created) == ["bougie-ambre", "bougie-ambre-2", "bougie-ambre-3"]
+
+
+def test_rejected_rows_are_reported_by_line(client, admin_headers):
+    content = (
+        _ndjson({"name": "Vase bleu", "price": 12})
+        + "{pas du json\n"
+        + _ndjson({"name": "Vase vert"}, {"name": "Vase rose", "price": 9, "category": "inconnue"})
+    )
+    report = _import(client, admin_headers, "vases.jsonl", content)
+    assert report["created"] == 1
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][2]["error"] == "Catégorie inconnue : inconnue"
+
+
+def test_failed_chunk_is_replayed_row_by_row(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(settings, "PRODUCT_IMPORT_CHUNK_SIZE", 3)
+    # "nan" passes validation but SQLite stores NaN as NULL, which the NOT
+    # NULL price constraint rejects, so the whole first chunk fails.
+    rows = [
+        {"slug": "rejeu-1", "name": "Rejeu 1", "price": 1},
+        {"slug": "rejeu-2", "name": "Rejeu 2", "price": "nan"},
+        {"slug": "rejeu-3", "name": "Rejeu 3", "price": 3},
+        {"slug": "rejeu-4", "name": "Rejeu 4", "price": 4},
+    ]
+    report = _import(client, admin_headers, "rejeu.ndjson", _ndjson(*rows))
+    assert report["created"] == 3
+    assert report["failed"] == 1
+    assert report["errors"][0]["line"] == 2
+    assert "NOT NULL" in report["errors"][0]["error"]
+    assert sorted(_products("rejeu-1", "rejeu-2", "rejeu-3", "rejeu-4")) == ["rejeu-1", "rejeu-3", "rejeu-4"]
@@ -0,0 +1,216 @@
+"""EXPLAIN QUERY PLAN regression test for the router queries.
+
+Every SQL statement run while exercising the API against a realistically
+sized catalog is re-run under EXPLAIN QUERY PLAN; a full table scan or a
+temp B-tree sort fails the test unless the statement is listed in
+ALLOWED with the reason it is acceptable.
+"""
+import re
+import time
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import ReadSessionLocal, engine
+from app.models.product import Product
+from app.services.cache import catalog_cache
+from app.routers.products import _compute_facets, clear_listing_caches
+
+PRODUCTS = 100_000
+USERS = 5_000
+ORDERS = 50_000
+ITEMS_PER_ORDER = 3
+CART_LINES = 3
+
+# (substring of the statement, plan detail it may show, reason)
+ALLOWED = [
+    ("FROM categories", "SCAN categories", "a handful of rows"),
+    ("products_fts MATCH", "USE TEMP B-TREE FOR ORDER BY", "relevance is ranked per search, over the matches only"),
+    ("GROUP BY products.category_id", "USE TEMP B-TREE FOR GROUP BY", "search facets, over the matches only"),
+    ("FROM product_facet_counts", "SCAN product_facet_counts", "one row per category, price and stock state"),
+    ("FROM product_facet_counts", "USE TEMP B-TREE FOR GROUP BY", "one row per category, price and stock state"),
+    ("product_sales_rollups", "USE TEMP B-TREE FOR GROUP BY", "groups at most days x products rollup rows"),
+    ("FROM stat_counters", "SCAN stat_counters", "four rows"),
+]
+
+
+def _bulk_load() -> None:
+    series = "WITH RECURSIVE n(v) AS (SELECT 1 UNION ALL SELECT v + 1 FROM n WHERE v < {count}) "
+    with engine.begin() as connection:
+        run = connection.exec_driver_sql
+        run(
+            series.format(count=PRODUCTS)
+            + "INSERT INTO products (name, slug, description, price, image_url, stock, reserved, is_active,"
+            " category_id, created_at) SELECT 'Produit ' || v, 'produit-' || v, '', (v % 500) + 0.99, '',"
+            " v % 50, 0, v % 10 != 0, v % 4 + 1, datetime('2025-01-01', '+' || v || ' minutes') FROM n"
+        )
+        first_user = run("SELECT COALESCE(MAX(id), 0) + 1 FROM users").scalar()
+        run(
+            series.format(count=USERS)
+            + "INSERT INTO users (email, hashed_password, full_name, is_active, is_admin, token_version)"
+            " SELECT 'client' || v || '@example.com', 'x', 'Client ' || v, 1, 0, 0 FROM n"
+        )
+        run(
+            series.format(count=ORDERS)
+            + "INSERT INTO orders (user_id, total, status, shipping_address, created_at)"
+            " SELECT v % " + str(USERS) + " + 3, 100, 'pending', 'adresse',"
+            " datetime('2025-06-01', '+' || (v * 10) || ' minutes') FROM n"
+        )
+        run(
+            series.format(count=ORDERS * ITEMS_PER_ORDER)
+            + "INSERT INTO order_items (order_id, product_id, quantity, price_at_time, product_name, product_slug,"
+            " product_image_url, category_name) SELECT (v - 1) / " + str(ITEMS_PER_ORDER) + " + 1,"
+            " v % 1000 + 1, 1, 10, 'Produit', 'produit', '', 'Sport' FROM n"
+        )
+        # Saved carts and open holds: a few lines per shopper.
+        run(
+            series.format(count=USERS * CART_LINES)
+            + "INSERT INTO cart_items (user_id, product_id, quantity)"
+            f" SELECT (v - 1) / {CART_LINES} + {first_user}, v % 1000 + 1, 1 FROM n"
+        )
+        run(
+            "INSERT INTO stock_reservations (user_id, product_id, quantity, expires_at)"
+            " SELECT user_id, product_id, quantity, datetime('now', '+15 minutes') FROM cart_items"
+            f" WHERE user_id >= {first_user}"
+        )
+        run(
+            "UPDATE products SET reserved = reserved + held.quantity FROM ("
+            "SELECT product_id, SUM(quantity) AS quantity FROM stock_reservations"
+            f" WHERE user_id >= {first_user} GROUP BY product_id) AS held WHERE products.id = held.product_id"
+        )
+        for granularity, bucket in (("hour", "%Y-%m-%d %H:00:00.000000"), ("day", "%Y-%m-%d 00:00:00.000000")):
+            run(
+                "INSERT OR IGNORE INTO revenue_rollups (granularity, bucket_start, orders, revenue)"
+                f" SELECT '{granularity}', strftime('{bucket}', created_at), count(*), sum(total)"
+                " FROM orders GROUP BY 2"
+            )
+        run(
+            "INSERT OR IGNORE INTO product_sales_rollups (day, product_id, category_name, product_name, units, revenue)"
+            " SELECT strftime('%Y-%m-%d 00:00:00.000000', o.created_at), i.product_id, i.category_name,"
+            " max(i.product_name), sum(i.quantity), sum(i.quantity * i.price_at_time)"
+            " FROM order_items i JOIN orders o ON o.id = i.order_id GROUP BY 1, 2, 3"
+        )
+        run("ANALYZE")
+
+
+@pytest.fixture(scope="module")
+def statements(client, admin_headers, user_headers):
+    _bulk_load()
+    catalog_cache.clear()
+    clear_listing_caches()
+
+    captured: dict[str, tuple] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            captured.setdefault(statement, parameters)
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        _exercise(client, admin_headers, user_headers)
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    return captured
+
+
+def _exercise(client, admin_headers, user_headers) -> None:
+    def ok(response, status=200):
+        assert response.status_code == status, response.text
+        return response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+
+    for sort in ("newest", "price", "price_desc", "name"):
+        page = ok(client.get("/api/products/", params={"sort": sort, "limit": 12}))
+        ok(client.get("/api/products/", params={"sort": sort, "limit": 12, "after": page["next_cursor"]}))
+    ok(client.get("/api/products/", params={"category": "sport"}))
+    ok(client.get("/api/products/", params={"category": "sport", "sort": "price", "min_price": 10, "max_price": 200}))
+    ok(client.get("/api/products/", params={"in_stock": True}))
+    ok(client.get("/api/products/", params={"search": "casque"}))
+    ok(client.get("/api/products/casque-bluetooth"))
+    ok(client.get("/api/categories/"))
+    ok(client.get("/api/categories/sport"))
+
+    ok(client.get("/api/auth/me", headers=user_headers))
+    ok(client.post("/api/cart/items", json={"product_id": 1, "quantity": 1}, headers=user_headers))
+    ok(client.post("/api/cart/batch", json={"operations": [{"op": "add", "product_id": 2, "quantity": 1}]},
+                   headers=user_headers))
+    ok(client.patch("/api/cart/items/2", json={"quantity": 2}, headers=user_headers))
+    ok(client.get("/api/cart/", headers=user_headers))
+    ok(client.get("/api/cart/summary", headers=user_headers))
+    order = ok(client.post("/api/orders/", json={"shipping_address": "1 rue de la Paix"}, headers=user_headers), 201)
+    ok(client.get("/api/orders/", headers=user_headers))
+    ok(client.get(f"/api/orders/{order['id']}", headers=user_headers))
+
+    page = ok(client.get("/api/admin/orders", params={"limit": 20}, headers=admin_headers))
+    ok(client.get("/api/admin/orders", params={"limit": 20, "after": page["next_cursor"]}, headers=admin_headers))
+    ok(client.get("/api/admin/orders", params={"status": "pending", "date_from": "2025-07-01T00:00:00"},
+                  headers=admin_headers))
+    ok(client.get(f"/api/admin/orders/{order['id']}", headers=admin_headers))
+    ok(client.get("/api/admin/stats", headers=admin_headers))
+    ok(client.get("/api/admin/stats/timeseries", headers=admin_headers))
+    ok(client.get("/api/admin/analytics", params={"from": "2025-06-01T05:00:00", "to": "2025-07-01T00:00:00"},
+                  headers=admin_headers))
+
+
+def _violations(statement: str, plan: list[str]) -> list[str]:
+    # Walking an index in order under a LIMIT stops after one page, so only
+    # a scan without either counts as a full table scan.
+    limited = " LIMIT " in statement
+    return [
+        detail for detail in plan
+        if (
+            detail.startswith("SCAN")
+            and "VIRTUAL TABLE" not in detail
+            and "CONSTANT ROW" not in detail
+            and not (limited and "USING" in detail and "INDEX" in detail)
+        )
+        or "USE TEMP B-TREE" in detail
+    ]
+
+
+def test_router_queries_use_indexes(statements):
+    failures = []
+    with engine.connect() as connection:
+        for statement, parameters in statements.items():
+            plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            bad = [
+                detail for detail in _violations(statement, plan)
+                if not any(text in statement and allowed in detail for text, allowed, _ in ALLOWED)
+            ]
+            if bad:
+                failures.append(f"{bad}\n  {' '.join(statement.split())}")
+    assert statements
+    assert not failures, "Queries without a usable index:\n" + "\n".join(failures)
+
+
+def test_facets_read_the_facet_table(statements):
+    facet_statements = [statement for statement in statements if "FROM product_facet_counts" in statement]
+    assert facet_statements
+    with engine.connect() as connection:
+        for statement in facet_statements:
+            plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", statements[statement])]
+            assert not [detail for detail in plan if re.search(r"\bproducts\b", detail)], plan
+
+
+def test_facet_counts_match_the_catalog(statements):
+    with engine.connect() as connection:
+        expected = connection.exec_driver_sql(
+            "SELECT COALESCE(category_id, 0), price, COALESCE(stock, 0) > 0, COUNT(*)"
+            " FROM products WHERE is_active GROUP BY 1, 2, 3"
+        ).all()
+        actual = connection.exec_driver_sql("SELECT category_id, price, stocked, count FROM product_facet_counts").all()
+    assert sorted(actual) == sorted(expected)
+
+
+def test_facets_stay_within_budget_uncached(statements):
+    db = ReadSessionLocal()
+    try:
+        base = db.query(Product).filter(Product.is_active == True)
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            _compute_facets(base, None, "sport", 10, 200, True)
+            timings.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    assert min(timings) < 0.005, timings
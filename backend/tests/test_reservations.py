@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.models.product import Product
+from app.models.reservation import StockReservation
+from app.models.user import User
+from app.services.auth import create_access_token
+from app.services.reservations import release_expired_holds
+
+_numbers = count()
+
+
+def _new_shopper() -> tuple[int, dict]:
+    db = SessionLocal()
+    try:
+        user = User(email=f"reserve{next(_numbers)}@example.com", full_name="Réserve", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user.id, {"Authorization": "Bearer " + create_access_token({"sub": str(user.id), "ver": 0})}
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def shopper():
+    return _new_shopper()
+
+
+@pytest.fixture
+def another_shopper():
+    return _new_shopper()
+
+
+@pytest.fixture
+def product(client, admin_headers):
+    response = client.post(
+        "/api/admin/products", json={"name": "Article réservé", "price": 8, "stock": 5}, headers=admin_headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _hold(client, headers, product_id: int, quantity: int) -> None:
+    response = client.post("/api/cart/items", json={"product_id": product_id, "quantity": quantity}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def _expire(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(StockReservation)
+            .where(StockReservation.user_id == user_id)
+            .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _state(product_id: int) -> tuple[int, int, dict[int, int]]:
+    db = SessionLocal()
+    try:
+        stock, reserved = db.query(Product.stock, Product.reserved).filter(Product.id == product_id).one()
+        holds = dict(db.execute(
+            select(StockReservation.user_id, StockReservation.quantity).where(StockReservation.product_id == product_id)
+        ).all())
+        return stock, reserved, holds
+    finally:
+        db.close()
+
+
+def test_sweeper_releases_only_expired_holds(client, product, shopper, another_shopper):
+    (late, late_headers), (active, active_headers) = shopper, another_shopper
+    _hold(client, late_headers, product, 2)
+    _hold(client, active_headers, product, 1)
+    _expire(late)
+
+    assert release_expired_holds() >= 1
+    assert _state(product) == (5, 1, {active: 1})
+
+    # Adding to the cart again holds its whole line from the freed stock.
+    _hold(client, late_headers, product, 2)
+    assert _state(product) == (5, 5, {active: 1, late: 4})
+
+
+def test_checkout_after_the_hold_was_swept(client, product, shopper):
+    user_id, headers = shopper
+    _hold(client, headers, product, 2)
+    _expire(user_id)
+    release_expired_holds()
+    assert _state(product) == (5, 0, {})
+
+    response = client.post("/api/orders/", json={"shipping_address": "2 rue du Port"}, headers=headers)
+    assert response.status_code == 201, response.text
+    assert _state(product) == (3, 0, {})
+
+
+def test_checkout_of_an_expired_hold_never_leaves_reserved_negative(client, product, shopper):
+    user_id, headers = shopper
+    _hold(client, headers, product, 2)
+    _expire(user_id)
+    # The counter lost track of the hold (it was reconciled, or released twice).
+    db = SessionLocal()
+    try:
+        db.execute(update(Product).where(Product.id == product).values(reserved=0))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post("/api/orders/", json={"shipping_address": "2 rue du Port"}, headers=headers)
+    assert response.status_code == 201, response.text
+    assert _state(product) == (3, 0, {})
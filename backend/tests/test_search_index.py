@@ -0,0 +1,30 @@
+def _search(client, term: str) -> list[str]:
+    response = client.get("/api/products/", params={"search": term})
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()["products"]]
+
+
+def test_search_follows_product_writes(client, admin_headers):
+    response = client.post(
+        "/api/admin/products",
+        json={"name": "Théière Zéphyrine", "description": "Fonte émaillée", "price": 42.0, "category_id": 3},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201, response.text
+    product_id = response.json()["id"]
+    assert _search(client, "zephyrine") == ["Théière Zéphyrine"]
+    assert _search(client, "emaillee") == ["Théière Zéphyrine"]
+
+    response = client.put(
+        f"/api/admin/products/{product_id}",
+        json={"name": "Théière Borée", "description": "Grès"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert _search(client, "zephyrine") == []
+    assert _search(client, "emaillee") == []
+    assert _search(client, "boree") == ["Théière Borée"]
+
+    response = client.delete(f"/api/admin/products/{product_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert _search(client, "boree") == []
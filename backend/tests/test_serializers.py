@@ -0,0 +1,122 @@
+"""The orjson serializers must render exactly what the response_model schemas would."""
+from datetime import datetime
+
+import orjson
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.database import SessionLocal
+from app.models.category import Category
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.schemas.cart import CartResponse
+from app.schemas.category import CategoryResponse
+from app.schemas.order import OrderListResponse, OrderResponse
+from app.schemas.product import ProductResponse
+from app.services.orders import list_order_summaries
+from app.services.serializers import (
+    FastJSONResponse,
+    dump_json,
+    serialize_cart,
+    serialize_category,
+    serialize_order,
+    serialize_product,
+)
+
+
+def _as_schema(schema, payload) -> dict:
+    # What FastAPI sent before: the payload validated against the
+    # response_model, then dumped in JSON mode.
+    return schema.model_validate(payload).model_dump(mode="json")
+
+
+def _as_orjson(payload) -> dict:
+    return orjson.loads(dump_json(payload))
+
+
+@pytest.fixture(scope="module")
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="module")
+def products(db):
+    category = Category(name="Sérialisation", slug="serialisation", description="")
+    db.add(category)
+    db.flush()
+    db.add_all([
+        # A whole-number price, microseconds and a category.
+        Product(name="Lampe ronde", slug="lampe-ronde", description="Éclairage doux", price=30,
+                stock=3, category_id=category.id, created_at=datetime(2026, 3, 1, 9, 30, 15, 250000)),
+        # No category, a fractional price and no microseconds.
+        Product(name="Sans catégorie", slug="sans-categorie", description="", price=0.1 + 0.2,
+                stock=0, is_active=False, created_at=datetime(2026, 3, 1, 9, 30)),
+    ])
+    db.commit()
+    return db.scalars(
+        select(Product)
+        .options(joinedload(Product.category))
+        .where(Product.slug.in_(["lampe-ronde", "sans-categorie"]))
+        .order_by(Product.id)
+    ).all()
+
+
+def test_product_matches_schema(products):
+    for product in products:
+        payload = serialize_product(product)
+        assert _as_orjson(payload) == _as_schema(ProductResponse, payload)
+    with_category, without_category = (_as_orjson(serialize_product(p)) for p in products)
+    assert with_category["price"] == 30.0
+    assert with_category["created_at"] == "2026-03-01T09:30:15.250000"
+    assert without_category["category_id"] is None
+    assert without_category["category_name"] == ""
+    assert without_category["price"] == 0.1 + 0.2
+
+
+def test_category_matches_schema(products):
+    payload = serialize_category(products[0].category)
+    assert _as_orjson(payload) == _as_schema(CategoryResponse, payload)
+
+
+def test_cart_matches_schema(products):
+    lines = {product.id: quantity for product, quantity in zip(products, (2, 1))}
+    lines[999_999] = 1  # product deleted since it was added
+    payload = serialize_cart(lines, {product.id: product for product in products})
+    assert _as_orjson(payload) == _as_schema(CartResponse, payload)
+    assert [item["product_id"] for item in payload["items"]] == [product.id for product in products]
+
+
+def test_orders_match_schema(db, products):
+    order = Order(user_id=2, total=60.3, shipping_address="1 rue de la Paix", created_at=datetime(2026, 3, 2, 8, 0, 0, 1))
+    db.add(order)
+    db.flush()
+    db.execute(insert(OrderItem), [
+        {"order_id": order.id, "product_id": product.id, "quantity": 2, "price_at_time": product.price,
+         "product_name": product.name, "product_slug": product.slug, "product_image_url": "",
+         "category_name": product.category.name if product.category else ""}
+        for product in products
+    ])
+    order_id = order.id
+    db.commit()
+
+    # Read back the way the routes do, from a fresh session.
+    reader = SessionLocal()
+    try:
+        loaded = reader.scalar(select(Order).options(selectinload(Order.items)).where(Order.id == order_id))
+        payload = serialize_order(loaded)
+        page = list_order_summaries(reader, 100, None, Order.id == order_id)
+    finally:
+        reader.close()
+    assert _as_orjson(payload) == _as_schema(OrderResponse, payload)
+    assert _as_orjson(payload)["created_at"] == "2026-03-02T08:00:00.000001"
+    assert _as_orjson(page) == _as_schema(OrderListResponse, page)
+
+
+def test_fast_json_response_renders_with_orjson(products):
+    payload = serialize_product(products[0])
+    assert FastJSONResponse(payload).body == dump_json(payload)
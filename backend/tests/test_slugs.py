@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+import app.services.slugs as slugs_module
+from app.database import SessionLocal
+from app.models.category import Category
+from app.models.product import Product
+from app.services.slugs import allocate_slugs, flush_with_unique_slug
+
+WRITERS = 8
+
+
+def test_allocation_continues_past_the_highest_numeric_suffix():
+    db = SessionLocal()
+    try:
+        for slug in ("lampe-sel", "lampe-sel-2", "lampe-sel-10", "lampe-sel-9", "lampe-sel-2-ampoules", "vasque-2"):
+            db.add(Product(name=slug, slug=slug, price=1))
+        db.flush()
+        assert allocate_slugs(db, Product.slug, ["lampe-sel", "lampe-sel", "vasque", "vasque", "inedit"]) == [
+            # 10 is the highest numeric suffix ("10" sorts before "9" as text);
+            # "-2-ampoules" is another base. A free base repeated in the same
+            # batch still skips the suffixes already in use.
+            "lampe-sel-11", "lampe-sel-12", "vasque", "vasque-3", "inedit",
+        ]
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_savepoint_does_not_commit_the_outer_transaction():
+    db = SessionLocal()
+    try:
+        flush_with_unique_slug(db, Category(name="Éphémère"), "ephemere")
+        db.rollback()
+        assert db.scalar(select(Category.id).where(Category.slug == "ephemere")) is None
+    finally:
+        db.close()
+
+
+def test_slug_conflict_retry_keeps_earlier_changes(monkeypatch):
+    db = SessionLocal()
+    try:
+        db.add(Product(name="Casque filaire", slug="casque-filaire", description="Jack 3,5 mm", price=19))
+        db.commit()
+        product = db.scalar(select(Product).where(Product.slug == "casque-filaire"))
+        product_id = product.id
+        product.description = "Jack 3,5 mm, câble tressé"
+        allocations = iter(["casque-bluetooth", "casque-filaire-pro"])  # the first is already taken
+        monkeypatch.setattr(slugs_module, "allocate_slug", lambda *args: next(allocations))
+
+        flush_with_unique_slug(db, product, "casque-filaire-pro")
+        db.commit()
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        renamed = db.get(Product, product_id)
+        assert (renamed.slug, renamed.description) == ("casque-filaire-pro", "Jack 3,5 mm, câble tressé")
+    finally:
+        db.close()
+
+
+def test_concurrent_duplicate_names_get_distinct_slugs(client, admin_headers):
+    def create(_) -> tuple[int, str]:
+        response = client.post(
+            "/api/admin/products", json={"name": "Chaise pliante", "price": 35}, headers=admin_headers
+        )
+        return response.status_code, response.json().get("slug")
+
+    with ThreadPoolExecutor(WRITERS) as executor:
+        results = list(executor.map(create, range(WRITERS)))
+
+    assert [status for status, _ in results] == [201] * WRITERS
+    assert sorted(slug for _, slug in results) == sorted(
+        ["chaise-pliante"] + [f"chaise-pliante-{n}" for n in range(2, WRITERS + 1)]
+    )
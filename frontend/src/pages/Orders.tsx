@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { Package } from 'lucide-react';
 import client from '../api/client';
-import type { Order } from '../types/order';
+import type { Order, OrderListResponse, OrderSummary } from '../types/order';
 import LoadingSpinner from '../components/LoadingSpinner';
 
 const statusLabels: Record<string, string> = {
@@ -21,17 +21,39 @@ const statusColors: Record<string, string> = {
 };
 
 export default function Orders() {
-  const [orders, setOrders] = useState<Order[]>([]);
+  const [orders, setOrders] = useState<OrderSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [details, setDetails] = useState<Record<number, Order>>({});
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
+  const fetchOrders = (after: string | null = null) =>
     client
-      .get('/orders')
-      .then((res) => setOrders(res.data))
-      .catch(() => {})
-      .finally(() => setLoading(false));
+      .get<OrderListResponse>('/orders/', { params: after ? { after } : {} })
+      .then((res) => {
+        setOrders((prev) => (after ? [...prev, ...res.data.orders] : res.data.orders));
+        setNextCursor(res.data.next_cursor);
+      })
+      .catch(() => {});
+
+  useEffect(() => {
+    fetchOrders().finally(() => setLoading(false));
   }, []);
 
+  const toggleDetails = (orderId: number) => {
+    if (details[orderId]) {
+      setDetails((prev) => {
+        const next = { ...prev };
+        delete next[orderId];
+        return next;
+      });
+      return;
+    }
+    client
+      .get<Order>(`/orders/${orderId}`)
+      .then((res) => setDetails((prev) => ({ ...prev, [orderId]: res.data })))
+      .catch(() => {});
+  };
+
   if (loading) return <LoadingSpinner />;
 
   return (
@@ -63,10 +85,17 @@ export default function Orders() {
               </div>
 
               <div className="border-t pt-3 space-y-2">
-                {order.items.map((item) => (
+                <button
+                  onClick={() => toggleDetails(order.id)}
+                  className="text-sm text-primary hover:underline"
+                >
+                  {order.item_count} article{order.item_count > 1 ? 's' : ''} &middot;{' '}
+                  {details[order.id] ? 'Masquer le détail' : 'Voir le détail'}
+                </button>
+                {details[order.id]?.items.map((item) => (
                   <div key={item.id} className="flex justify-between text-sm">
                     <span className="text-gray-600">
-                      {item.product.name} x {item.quantity}
+                      {item.product_name} x {item.quantity}
                     </span>
                     <span className="text-gray-900">
                       {(item.price_at_time * item.quantity).toFixed(2)} &euro;
@@ -76,6 +105,16 @@ export default function Orders() {
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={() => fetchOrders(nextCursor)}
+                className="px-4 py-2 text-sm border rounded-lg hover:bg-gray-50"
+              >
+                Charger plus
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
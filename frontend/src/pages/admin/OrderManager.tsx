@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import toast from 'react-hot-toast';
 import client from '../../api/client';
-import type { Order } from '../../types/order';
+import type { OrderListResponse, OrderSummary } from '../../types/order';
 import LoadingSpinner from '../../components/LoadingSpinner';
 
 const statusOptions = [
@@ -13,27 +13,28 @@ const statusOptions = [
 ];
 
 export default function OrderManager() {
-  const [orders, setOrders] = useState<Order[]>([]);
+  const [orders, setOrders] = useState<OrderSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
-  const fetchOrders = () => {
-    setLoading(true);
+  const fetchOrders = (after: string | null = null) =>
     client
-      .get('/admin/orders')
-      .then((res) => setOrders(res.data))
-      .catch(() => {})
-      .finally(() => setLoading(false));
-  };
+      .get<OrderListResponse>('/admin/orders', { params: after ? { after } : {} })
+      .then((res) => {
+        setOrders((prev) => (after ? [...prev, ...res.data.orders] : res.data.orders));
+        setNextCursor(res.data.next_cursor);
+      })
+      .catch(() => {});
 
   useEffect(() => {
-    fetchOrders();
+    fetchOrders().finally(() => setLoading(false));
   }, []);
 
   const updateStatus = async (orderId: number, status: string) => {
     try {
       await client.patch(`/admin/orders/${orderId}/status`, { status });
       toast.success('Statut mis à jour');
-      fetchOrders();
+      setOrders((prev) => prev.map((order) => (order.id === orderId ? { ...order, status } : order)));
     } catch {
       toast.error('Erreur lors de la mise à jour');
     }
@@ -66,7 +67,7 @@ export default function OrderManager() {
                 </td>
                 <td className="px-4 py-3 font-medium text-gray-900">{order.total.toFixed(2)} &euro;</td>
                 <td className="px-4 py-3 text-gray-600 text-sm">
-                  {order.items.map((item) => `${item.product.name} x${item.quantity}`).join(', ')}
+                  {order.item_count}
                 </td>
                 <td className="px-4 py-3 text-gray-600 text-sm max-w-48 truncate">
                   {order.shipping_address}
@@ -87,6 +88,16 @@ export default function OrderManager() {
           </tbody>
         </table>
       </div>
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={() => fetchOrders(nextCursor)}
+            className="px-4 py-2 text-sm border rounded-lg hover:bg-gray-50"
+          >
+            Charger plus
+          </button>
+        </div>
+      )}
     </div>
   );
 }
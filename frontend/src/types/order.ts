@@ -1,11 +1,12 @@
-import type { Product } from './product';
-
 export interface OrderItem {
   id: number;
   product_id: number;
   quantity: number;
   price_at_time: number;
-  product: Product;
+  product_name: string;
+  product_slug: string;
+  product_image_url: string;
+  category_name: string;
 }
 
 export interface Order {
@@ -16,3 +17,17 @@ export interface Order {
   created_at: string;
   items: OrderItem[];
 }
+
+export interface OrderSummary {
+  id: number;
+  total: number;
+  status: string;
+  shipping_address: string;
+  created_at: string;
+  item_count: number;
+}
+
+export interface OrderListResponse {
+  orders: OrderSummary[];
+  next_cursor: string | null;
+}